@@ -19,12 +19,19 @@ When testing route planning, you should see:
 """
 
 import asyncio
-import json
+import atexit
+import logging
+import logging.handlers
 import os
+import queue
+import sys
 import time
-from typing import Annotated, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Annotated, Optional, Union
 from dotenv import load_dotenv
 import httpx
+import orjson
 
 from livekit import agents, rtc
 from livekit.agents import (
@@ -32,6 +39,7 @@ from livekit.agents import (
     AgentSession,
     AutoSubscribe,
     JobContext,
+    JobProcess,
     RunContext,
     WorkerOptions,
     cli,
@@ -47,6 +55,130 @@ from livekit.plugins.deepgram import STT as DeepgramSTT, TTS as DeepgramTTS
 # Load environment variables
 load_dotenv()
 
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    """Read a boolean env flag: 1/true/yes/on (any case) is on, any other value is off"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Verbose per-event logging in session callbacks (NOMAD_DEBUG=1). Read once at import so
+# the event handlers only pay a global bool check when it is off.
+_DEBUG = _env_flag("NOMAD_DEBUG")
+
+# Startup banner from the first on_enter in this process (NOMAD_STARTUP_VERBOSE=0 turns it
+# off; errors still log). Later rooms served by the same worker skip it
+_STARTUP_VERBOSE = _env_flag("NOMAD_STARTUP_VERBOSE", default=True)
+_startup_banner_logged = False
+
+# API keys and provider selection, read once at import rather than on every room start
+_DEEPGRAM_KEY = os.getenv("DEEPGRAM_API_KEY")
+_ANTHROPIC_KEY = os.getenv("ANTHROPIC_API_KEY")
+_OPENAI_KEY = os.getenv("OPENAI_API_KEY")
+_LLM_PROVIDER = os.getenv("LLM_PROVIDER", "anthropic").lower().strip()
+
+# Max number of (start, destination, route_type) results kept by the update_map fast path
+ROUTE_CACHE_SIZE = 32
+
+
+class _BatchingStreamHandler(logging.StreamHandler):
+    """StreamHandler that leaves flushing the stream to the log listener"""
+    
+    def emit(self, record):
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+class _DrainingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that flushes its handlers once the queue is drained, so a burst of
+    records becomes one stream flush instead of one per line
+    """
+    
+    def handle(self, record):
+        super().handle(record)
+        if self.queue.empty():
+            for handler in self.handlers:
+                handler.flush()
+
+
+if hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(line_buffering=False)
+
+# Log calls only enqueue the record; formatting and stdout I/O happen on the listener's
+# background thread, so chatty event handlers never block the event loop on a slow pipe
+_log_stream_handler = _BatchingStreamHandler(sys.stdout)
+_log_stream_handler.setFormatter(logging.Formatter("%(message)s"))
+_log_queue = queue.SimpleQueue()
+_log_listener = _DrainingQueueListener(_log_queue, _log_stream_handler)
+
+log = logging.getLogger("nomad.agent")
+log.setLevel(logging.INFO)
+log.addHandler(logging.handlers.QueueHandler(_log_queue))
+log.propagate = False
+
+
+def _start_log_listener():
+    """Start the log writer thread if it isn't running"""
+    if _log_listener._thread is None:
+        _log_listener.start()
+
+
+def _stop_log_listener():
+    """Drain queued records and stop the log writer thread"""
+    if _log_listener._thread is not None:
+        _log_listener.stop()
+
+
+_start_log_listener()
+atexit.register(_stop_log_listener)
+if hasattr(os, "register_at_fork"):
+    # Drain and stop the writer around fork() so a job process neither inherits half-written
+    # output nor a lock held by a thread that doesn't exist there, then restart it on both sides
+    os.register_at_fork(
+        before=_stop_log_listener,
+        after_in_parent=_start_log_listener,
+        after_in_child=_start_log_listener,
+    )
+
+
+# Data-channel wire format. "json" (default) sends plain JSON / NDJSON frames; "msgpack"
+# sends binary msgpack frames prefixed with MSGPACK_FRAME_TAG so the frontend can tell
+# them apart during rollout (a JSON frame never starts with 0x01).
+MSGPACK_FRAME_TAG = b"\x01"
+_WIRE_MSGPACK = os.getenv("NOMAD_WIRE_FORMAT", "json").lower() == "msgpack"
+if _WIRE_MSGPACK:
+    try:
+        import msgpack
+    except ImportError:
+        log.warning("⚠️ NOMAD_WIRE_FORMAT=msgpack but msgpack is not installed - using JSON")
+        _WIRE_MSGPACK = False
+
+
+# Opt-in (NOMAD_COALESCE_DATA=1): data messages queued within one event-loop tick go out
+# as a single frame - newline-delimited JSON, or several objects behind one msgpack tag.
+# Off by default so every frame carries exactly one message for existing frontends.
+_COALESCE_DATA = _env_flag("NOMAD_COALESCE_DATA")
+
+
+def _pack(message: dict) -> bytes:
+    """Encode one data-channel message in the configured wire format"""
+    if _WIRE_MSGPACK:
+        return msgpack.packb(message, use_bin_type=True)
+    return orjson.dumps(message)
+
+
+@lru_cache(maxsize=128)
+def _encode_envelope(frozen_message: tuple) -> bytes:
+    """Encode a flat data message given as a tuple of (key, value) pairs.
+    State and control messages repeat constantly, so their bytes are memoized.
+    """
+    return _pack(dict(frozen_message))
+
+
 # System prompt for the AI agent
 SYSTEM_PROMPT = """You are the Nomad Travel Concierge. You are a participant in a live video call. Your goal is to help users plan a trip by using your tools.
 
@@ -211,6 +343,44 @@ Tone: Helpful, enthusiastic, and CONCISE. Keep responses short and to the point.
 class NomadAgent(Agent):
     """Nomad Voice Agent with tool calling and real-time map sync"""
     
+    # @function_tool methods exposed to the LLM (auto-discovered by Agent)
+    _TOOL_METHODS = (
+        "search_restaurants",
+        "get_activities",
+        "search_hotels",
+        "generate_booking_payment",
+        "confirm_payment",
+        "add_to_itinerary",
+        "remove_from_itinerary",
+        "clear_itinerary",
+        "web_search",
+        "update_map",
+    )
+    
+    # (keywords, label) pairs used to log which tool a user turn should trigger
+    _INTENT_RULES = (
+        (("go to", "trip to", "route", "travel", "drive to", "from", "to", "plan"),
+         "📍 ROUTE PLANNING (should call update_map)"),
+        (("restaurant", "food", "eat", "dining", "hungry"),
+         "🍽️ RESTAURANTS (should call search_restaurants)"),
+        (("activity", "things to do", "attraction", "visit", "see"),
+         "🎯 ACTIVITIES (should call get_activities)"),
+        (("hotel", "stay", "accommodation", "lodging", "sleep"),
+         "🏨 HOTELS (should call search_hotels)"),
+        (("book", "pay", "purchase", "buy"),
+         "💳 PAYMENT (should call generate_booking_payment)"),
+    )
+    
+    # Constant parts of the MAP_UPDATE / ROUTE_UPDATE envelopes, pre-encoded so only the
+    # variable fields go through the JSON encoder on each broadcast
+    _MAP_PREFIX = b'{"type":"MAP_UPDATE","coordinates":'
+    _MAP_MID = b',"data":'
+    _ROUTE_PREFIX = b'{"type":"ROUTE_UPDATE","route":'
+    _ROUTE_WAYPOINTS = b',"waypoints":'
+    _ROUTE_PATH = b',"path":'
+    _ROUTE_BOUNDS = b',"bounds":'
+    _END = b"}"
+    
     def __init__(self, *args, **kwargs):
         # Extract instructions if provided separately, otherwise use default
         if 'instructions' not in kwargs:
@@ -226,29 +396,41 @@ class NomadAgent(Agent):
         
         super().__init__(*args, **kwargs)
         
-        # Log what tools Agent discovered (for debugging)
-        # Agent should auto-discover all @function_tool decorated methods
-        try:
-            agent_tools = getattr(self, 'tools', None) or []
-            if agent_tools:
-                tool_names = []
-                for tool in agent_tools:
-                    name = getattr(tool, '__name__', None) or getattr(tool, 'name', None) or str(tool)
-                    tool_names.append(name)
-                print(f"   ✅ Agent discovered {len(agent_tools)} tools: {tool_names}")
+        # Agent auto-discovers the @function_tool methods; only compare the count
+        # against the static list instead of walking every tool's name
+        if _DEBUG:
+            discovered = len(getattr(self, 'tools', None) or ())
+            if discovered == len(self._TOOL_METHODS):
+                log.info("   ✅ Agent registered %s tools, matching the expected list: %s", discovered, list(self._TOOL_METHODS))
             else:
-                print("   ⚠️ No tools found - Agent should auto-discover @function_tool methods")
-        except Exception as e:
-            print(f"   ⚠️ Could not check tools: {e}")
+                log.warning("   ⚠️ Agent registered %s tools, expected %s: %s", discovered, len(self._TOOL_METHODS), list(self._TOOL_METHODS))
         self.mcp_client = None
+        # Keep-alive httpx client for web_search, created on first use and reused after
+        self._web_client: Optional[httpx.AsyncClient] = None
         self.ctx = None
         self._room = None  # Store room reference for data publishing
+        # LRU of 2-waypoint update_map results keyed by normalized (start, destination, route_type)
+        self._route_cache: OrderedDict[tuple, dict] = OrderedDict()
+        # Strong refs to in-flight fire-and-forget broadcasts so they aren't GC'd mid-send
+        self._pending_bcasts: set[asyncio.Task] = set()
+        # Data messages queued within one event-loop tick (NOMAD_COALESCE_DATA=1), published as one frame
+        self._tx_buf: list[bytes] = []
+        self._tx_scheduled = False
+        # Event loop the agent runs on, cached in on_enter for sync event callbacks
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # (source dict, encoded bytes) of the last map/route broadcast. Holding the dict
+        # keeps its identity valid, so re-sending the same object (e.g. a route served
+        # from _route_cache) reuses the bytes instead of re-encoding the path
+        self._last_map: tuple[Optional[dict], bytes] = (None, b"")
+        self._last_route: tuple[Optional[dict], bytes] = (None, b"")
         # Note: self.session is a read-only property set by AgentSession
         # Don't try to set it here - it will be available after session.start()
         
     async def on_enter(self):
         """Called when agent becomes active"""
-        print("🤖 Nomad Agent activated")
+        self._loop = asyncio.get_running_loop()
+        # Informational lines are collected and emitted as one record (errors log immediately)
+        banner = ["🤖 Nomad Agent activated"]
         
         try:
             # Get room reference
@@ -261,74 +443,81 @@ class NomadAgent(Agent):
             
             if room:
                 self._room = room
-                print(f"   Room: {room.name}")
+                banner.append(f"   Room: {room.name}")
             
             # Initialize MCP client for tool calls
             try:
                 from mcp_client import MCPClient
-                print("   🔌 Connecting to MCP server...")
+                banner.append("   🔌 Connecting to MCP server...")
                 self.mcp_client = MCPClient()
                 await self.mcp_client.connect()
-                print("   ✅ MCP client connected")
+                banner.append("   ✅ MCP client connected")
             except Exception as e:
-                print(f"   ⚠️ MCP client failed: {e} (tools may not work)")
+                log.warning("   ⚠️ MCP client failed: %s (tools may not work)", e)
                 self.mcp_client = None
             
             # Initial greeting is now handled in entrypoint after session.start()
-            print("   ✅ Agent on_enter complete - greeting will be spoken by session")
+            banner.append("   ✅ Agent on_enter complete - greeting will be spoken by session")
                     
         except Exception as e:
-            print(f"   ❌ Error in on_enter: {e}")
+            log.error("   ❌ Error in on_enter: %s", e)
+        
+        global _startup_banner_logged
+        if _STARTUP_VERBOSE and not _startup_banner_logged:
+            _startup_banner_logged = True
+            log.info("\n".join(banner))
+    
+    async def on_exit(self):
+        """Called when the agent leaves the session: close its MCP and web_search connection pools"""
+        if self.mcp_client is not None:
+            try:
+                await self.mcp_client.disconnect()
+            except Exception as e:
+                log.warning("   ⚠️ MCP client close failed: %s", e)
+            self.mcp_client = None
+        if self._web_client is not None:
+            await self._web_client.aclose()
+            self._web_client = None
     
     async def on_user_turn_completed(self, turn_ctx, new_message):
         """Called after user speaks - triggers LLM to respond and potentially call tools"""
         message = new_message.text_content if hasattr(new_message, 'text_content') else str(new_message)
         
-        print("\n" + "=" * 60)
-        print(f"🎧 [USER TURN COMPLETED]")
-        print(f"   Message: \"{message}\"")
-        print("=" * 60)
+        log.info("\n" + "=" * 60)
+        log.info("🎧 [USER TURN COMPLETED]")
+        log.info("   Message: \"%s\"", message)
+        log.info("=" * 60)
         
         # Detect intent for logging
         message_lower = message.lower()
-        intents_detected = []
-        
-        if any(kw in message_lower for kw in ["go to", "trip to", "route", "travel", "drive to", "from", "to", "plan"]):
-            intents_detected.append("📍 ROUTE PLANNING (should call update_map)")
-        if any(kw in message_lower for kw in ["restaurant", "food", "eat", "dining", "hungry"]):
-            intents_detected.append("🍽️ RESTAURANTS (should call search_restaurants)")
-        if any(kw in message_lower for kw in ["activity", "things to do", "attraction", "visit", "see"]):
-            intents_detected.append("🎯 ACTIVITIES (should call get_activities)")
-        if any(kw in message_lower for kw in ["hotel", "stay", "accommodation", "lodging", "sleep"]):
-            intents_detected.append("🏨 HOTELS (should call search_hotels)")
-        if any(kw in message_lower for kw in ["book", "pay", "purchase", "buy"]):
-            intents_detected.append("💳 PAYMENT (should call generate_booking_payment)")
-            
+        intents_detected = [
+            label for keywords, label in self._INTENT_RULES
+            if any(kw in message_lower for kw in keywords)
+        ]
+        
         if intents_detected:
-            print(f"   🎯 Detected intents:")
+            log.info("   🎯 Detected intents:")
             for intent in intents_detected:
-                print(f"      - {intent}")
+                log.info("      - %s", intent)
         else:
-            print(f"   💬 General conversation (no specific tool intent detected)")
+            log.info("   💬 General conversation (no specific tool intent detected)")
         
         # IMPORTANT: Must call generate_reply() to trigger LLM processing and tool calls
         try:
             if hasattr(self, 'session') and self.session:
-                print(f"\n   🧠 [LLM] Sending to LLM for processing...")
-                print(f"   🧠 [LLM] Waiting for response (may include tool calls)...")
+                log.info("\n   🧠 [LLM] Sending to LLM for processing...")
+                log.info("   🧠 [LLM] Waiting for response (may include tool calls)...")
                 
                 await self.session.generate_reply(
                     user_input=message,
                     allow_interruptions=True
                 )
                 
-                print(f"   ✅ [LLM] Response generation complete")
+                log.info("   ✅ [LLM] Response generation complete")
             else:
-                print(f"   ❌ [ERROR] Session not available - cannot respond")
+                log.error("   ❌ [ERROR] Session not available - cannot respond")
         except Exception as e:
-            print(f"   ❌ [ERROR] LLM response failed: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("   ❌ [ERROR] LLM response failed: %s", e)
     
     def _get_participant_count(self) -> int:
         """Get the number of HUMAN participants in the room (excludes agents)"""
@@ -369,33 +558,32 @@ class NomadAgent(Agent):
         # Auto-detect num_guests from room participants
         if num_guests is None:
             num_guests = self._get_participant_count()
-            print(f"🔧 [TOOL] Auto-detected {num_guests} guests from room participants")
+            log.info("🔧 [TOOL] Auto-detected %s guests from room participants", num_guests)
         
-        print("\n" + "=" * 60)
-        print(f"🔧 [TOOL CALLED] search_restaurants")
-        print(f"   📍 Location: {location}")
-        print(f"   🍽️ Food Type: {food_type or 'any'}")
-        print(f"   👥 Guests: {num_guests}")
-        print("=" * 60)
+        log.info("\n" + "=" * 60)
+        log.info("🔧 [TOOL CALLED] search_restaurants")
+        log.info("   📍 Location: %s", location)
+        log.info("   🍽️ Food Type: %s", food_type or 'any')
+        log.info("   👥 Guests: %s", num_guests)
+        log.info("=" * 60)
         
-        await self._update_thinking_state(
+        self._spawn_broadcast(self._update_thinking_state(
             f"Searching for restaurants in {location} for {num_guests} guests...",
             tool_name="search_restaurants"
-        )
+        ))
         
         if not self.mcp_client:
-            print("   ❌ [ERROR] MCP client not initialized")
+            log.error("   ❌ [ERROR] MCP client not initialized")
             return {"error": "MCP client not initialized"}
         
         try:
-            result = await self.mcp_client.call_tool(
-                "search_restaurants",
-                location=location,
-                food_type=food_type,
-                num_guests=num_guests,
-                max_price_per_person=max_price_per_person,
-                min_rating=min_rating
-            )
+            result = await self.mcp_client.call_tool_payload("search_restaurants", {
+                "location": location,
+                "food_type": food_type,
+                "num_guests": num_guests,
+                "max_price_per_person": max_price_per_person,
+                "min_rating": min_rating
+            })
             
             # Populate cost estimates FIRST (before returning or broadcasting)
             # This ensures LLM and UI see the same prices
@@ -403,16 +591,16 @@ class NomadAgent(Agent):
             
             # Log the result with costs
             restaurant_count = len(result.get("restaurants", []))
-            print(f"   ✅ [RESULT] Found {restaurant_count} restaurants")
+            log.info("   ✅ [RESULT] Found %s restaurants", restaurant_count)
             if restaurant_count > 0:
                 for i, r in enumerate(result.get("restaurants", [])[:3]):
                     cost = r.get('estimated_cost_per_person', '?')
-                    print(f"      {i+1}. {r.get('name', 'Unknown')} - {r.get('rating', 'N/A')}⭐ ~${cost}/person")
+                    log.info("      %s. %s - %s⭐ ~$%s/person", i+1, r.get('name', 'Unknown'), r.get('rating', 'N/A'), cost)
             
-            await self._broadcast_map_update(result)
+            self._spawn_broadcast(self._broadcast_map_update(result))
             return result
         except Exception as e:
-            print(f"   ❌ [ERROR] {e}")
+            log.error("   ❌ [ERROR] %s", e)
             return {"error": str(e)}
     
     @function_tool()
@@ -435,32 +623,31 @@ class NomadAgent(Agent):
         # Auto-detect num_guests from room participants
         if num_guests is None:
             num_guests = self._get_participant_count()
-            print(f"🔧 [TOOL] Auto-detected {num_guests} guests from room participants")
+            log.info("🔧 [TOOL] Auto-detected %s guests from room participants", num_guests)
         
-        print(f"🔧 [TOOL] get_activities(location={location}, num_guests={num_guests})")
-        await self._update_thinking_state(
+        log.info("🔧 [TOOL] get_activities(location=%s, num_guests=%s)", location, num_guests)
+        self._spawn_broadcast(self._update_thinking_state(
             f"Finding activities in {location} for {num_guests} guests...",
             tool_name="get_activities"
-        )
+        ))
         
         if not self.mcp_client:
             return {"error": "MCP client not initialized"}
         
         try:
-            result = await self.mcp_client.call_tool(
-                "get_activities",
-                location=location,
-                num_guests=num_guests,
-                max_price_per_person=max_price_per_person,
-                min_rating=min_rating
-            )
+            result = await self.mcp_client.call_tool_payload("get_activities", {
+                "location": location,
+                "num_guests": num_guests,
+                "max_price_per_person": max_price_per_person,
+                "min_rating": min_rating
+            })
             # Populate cost estimates FIRST (before returning or broadcasting)
             result = self._populate_cost_estimates(result)
             
-            await self._broadcast_map_update(result)
+            self._spawn_broadcast(self._broadcast_map_update(result))
             return result
         except Exception as e:
-            print(f"   ❌ [TOOL ERROR] get_activities failed: {e}")
+            log.error("   ❌ [TOOL ERROR] get_activities failed: %s", e)
             return {"error": str(e)}
     
     @function_tool()
@@ -487,36 +674,35 @@ class NomadAgent(Agent):
         # Auto-detect num_guests from room participants
         if num_guests is None:
             num_guests = self._get_participant_count()
-            print(f"🔧 [TOOL] Auto-detected {num_guests} guests from room participants")
+            log.info("🔧 [TOOL] Auto-detected %s guests from room participants", num_guests)
         
         # Calculate num_rooms if not specified (2 guests per room)
         if num_rooms is None:
             num_rooms = max(1, (num_guests + 1) // 2)
-            print(f"🔧 [TOOL] Calculated {num_rooms} rooms for {num_guests} guests")
+            log.info("🔧 [TOOL] Calculated %s rooms for %s guests", num_rooms, num_guests)
         
-        print(f"🔧 [TOOL CALL] Calling 'search_hotels' tool")
-        print(f"   Location: {location}, Guests: {num_guests}, Rooms: {num_rooms}, Nights: {nights}")
+        log.info("🔧 [TOOL CALL] Calling 'search_hotels' tool")
+        log.info("   Location: %s, Guests: %s, Rooms: %s, Nights: %s", location, num_guests, num_rooms, nights)
         
         if not self.mcp_client:
             return {"error": "MCP client not initialized"}
         
         try:
-            result = await self.mcp_client.call_tool(
-                "search_hotels",
-                location=location,
-                num_guests=num_guests,
-                num_rooms=num_rooms,
-                nights=nights,
-                max_price_per_night=max_price_per_night,
-                min_rating=min_rating
-            )
+            result = await self.mcp_client.call_tool_payload("search_hotels", {
+                "location": location,
+                "num_guests": num_guests,
+                "num_rooms": num_rooms,
+                "nights": nights,
+                "max_price_per_night": max_price_per_night,
+                "min_rating": min_rating
+            })
             # Populate cost estimates FIRST (before returning or broadcasting)
             result = self._populate_cost_estimates(result)
             
-            await self._broadcast_map_update(result)
+            self._spawn_broadcast(self._broadcast_map_update(result))
             return result
         except Exception as e:
-            print(f"   ❌ [TOOL ERROR] search_hotels failed: {e}")
+            log.error("   ❌ [TOOL ERROR] search_hotels failed: %s", e)
             return {"error": str(e)}
     
     @function_tool()
@@ -542,17 +728,17 @@ class NomadAgent(Agent):
         pay_later = restaurant_cost
         estimated_total = paid_now + pay_later
 
-        print(f"🔧 [TOOL CALL] Calling 'generate_booking_payment' tool")
-        print(f"   📊 Cost Breakdown:")
-        print(f"      Hotels:      ${hotel_cost:.2f}")
-        print(f"      Activities:  ${activities_cost:.2f}")
-        print(f"      ─────────────────────")
-        print(f"      Pay Now:     ${paid_now:.2f}")
-        print(f"      ─────────────────────")
-        print(f"      Restaurants: ${restaurant_cost:.2f} (pay later)")
-        print(f"      ═════════════════════")
-        print(f"      Total Est:   ${estimated_total:.2f}")
-        print(f"   Demo Charge: 0.1 SOL (devnet)")
+        log.info("🔧 [TOOL CALL] Calling 'generate_booking_payment' tool")
+        log.info("   📊 Cost Breakdown:")
+        log.info("      Hotels:      $%.2f", hotel_cost)
+        log.info("      Activities:  $%.2f", activities_cost)
+        log.info("      ─────────────────────")
+        log.info("      Pay Now:     $%.2f", paid_now)
+        log.info("      ─────────────────────")
+        log.info("      Restaurants: $%.2f (pay later)", restaurant_cost)
+        log.info("      ═════════════════════")
+        log.info("      Total Est:   $%.2f", estimated_total)
+        log.info("   Demo Charge: 0.1 SOL (devnet)")
 
         try:
             # Send payment request to frontend
@@ -572,7 +758,7 @@ class NomadAgent(Agent):
                 "demo_note": "Devnet demo - actual charge is 0.1 SOL"
             }
             await self._send_payment_transaction(transaction_data)
-            print(f"   ✅ [SUCCESS] Payment request sent to frontend")
+            log.info("   ✅ [SUCCESS] Payment request sent to frontend")
 
             return {
                 "status": "pending_confirmation",
@@ -584,7 +770,7 @@ class NomadAgent(Agent):
                 "item_description": item_description
             }
         except Exception as e:
-            print(f"   ❌ [TOOL ERROR] generate_booking_payment failed: {e}")
+            log.error("   ❌ [TOOL ERROR] generate_booking_payment failed: %s", e)
             return {"error": str(e)}
 
     @function_tool()
@@ -595,15 +781,15 @@ class NomadAgent(Agent):
 
         This triggers the wallet popup on the frontend to complete the transaction.
         """
-        print(f"🔧 [TOOL CALL] Calling 'confirm_payment' tool")
-        print(f"   User has confirmed payment via voice")
+        log.info("🔧 [TOOL CALL] Calling 'confirm_payment' tool")
+        log.info("   User has confirmed payment via voice")
 
         try:
             await self._send_payment_execute()
-            print(f"   ✅ [SUCCESS] Payment execution triggered")
+            log.info("   ✅ [SUCCESS] Payment execution triggered")
             return {"status": "payment_execution_triggered", "message": "Wallet popup triggered on frontend"}
         except Exception as e:
-            print(f"   ❌ [TOOL ERROR] confirm_payment failed: {e}")
+            log.error("   ❌ [TOOL ERROR] confirm_payment failed: %s", e)
             return {"error": str(e)}
     
     @function_tool()
@@ -625,8 +811,8 @@ class NomadAgent(Agent):
             cost_label: Cost description (e.g., "$35/person" or "$180/night")
             location: Location/address of the item
         """
-        print(f"🔧 [TOOL CALL] add_to_itinerary")
-        print(f"   Item: {item_name}, Type: {item_type}, Cost: ${estimated_cost}")
+        log.info("🔧 [TOOL CALL] add_to_itinerary")
+        log.info("   Item: %s, Type: %s, Cost: $%s", item_name, item_type, estimated_cost)
         
         try:
             itinerary_message = {
@@ -641,10 +827,10 @@ class NomadAgent(Agent):
                 }
             }
             await self._send_data_message(itinerary_message)
-            print(f"   ✅ [SUCCESS] Added {item_name} to itinerary")
+            log.info("   ✅ [SUCCESS] Added %s to itinerary", item_name)
             return {"status": "added", "item": item_name}
         except Exception as e:
-            print(f"   ❌ [TOOL ERROR] add_to_itinerary failed: {e}")
+            log.error("   ❌ [TOOL ERROR] add_to_itinerary failed: %s", e)
             return {"error": str(e)}
     
     @function_tool()
@@ -654,8 +840,8 @@ class NomadAgent(Agent):
         Args:
             item_name: Name of the item to remove
         """
-        print(f"🔧 [TOOL CALL] remove_from_itinerary")
-        print(f"   Removing: {item_name}")
+        log.info("🔧 [TOOL CALL] remove_from_itinerary")
+        log.info("   Removing: %s", item_name)
         
         try:
             itinerary_message = {
@@ -663,24 +849,24 @@ class NomadAgent(Agent):
                 "item_name": item_name
             }
             await self._send_data_message(itinerary_message)
-            print(f"   ✅ [SUCCESS] Removed {item_name} from itinerary")
+            log.info("   ✅ [SUCCESS] Removed %s from itinerary", item_name)
             return {"status": "removed", "item": item_name}
         except Exception as e:
-            print(f"   ❌ [TOOL ERROR] remove_from_itinerary failed: {e}")
+            log.error("   ❌ [TOOL ERROR] remove_from_itinerary failed: %s", e)
             return {"error": str(e)}
     
     @function_tool()
     async def clear_itinerary(self, context: RunContext) -> dict:
         """Clear all items from the user's trip itinerary."""
-        print(f"🔧 [TOOL CALL] clear_itinerary")
+        log.info("🔧 [TOOL CALL] clear_itinerary")
         
         try:
-            itinerary_message = {"type": "ITINERARY_CLEAR"}
+            itinerary_message = _encode_envelope((("type", "ITINERARY_CLEAR"),))
             await self._send_data_message(itinerary_message)
-            print(f"   ✅ [SUCCESS] Cleared itinerary")
+            log.info("   ✅ [SUCCESS] Cleared itinerary")
             return {"status": "cleared"}
         except Exception as e:
-            print(f"   ❌ [TOOL ERROR] clear_itinerary failed: {e}")
+            log.error("   ❌ [TOOL ERROR] clear_itinerary failed: %s", e)
             return {"error": str(e)}
     
     @function_tool()
@@ -691,49 +877,50 @@ class NomadAgent(Agent):
         Args:
             query: Specific search query (e.g., "Hotel Vitale San Francisco room rate 2026")
         """
-        print(f"🔧 [TOOL CALL] Calling 'web_search' tool")
-        print(f"   Query: {query}")
+        log.info("🔧 [TOOL CALL] Calling 'web_search' tool")
+        log.info("   Query: %s", query)
         
         try:
             # Use DuckDuckGo instant answers API (free, no API key needed)
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    "https://api.duckduckgo.com/",
-                    params={
-                        "q": query,
-                        "format": "json",
-                        "no_html": 1,
-                        "skip_disambig": 1
-                    }
-                )
+            if self._web_client is None:
+                self._web_client = httpx.AsyncClient(timeout=10.0)
+            response = await self._web_client.get(
+                "https://api.duckduckgo.com/",
+                params={
+                    "q": query,
+                    "format": "json",
+                    "no_html": 1,
+                    "skip_disambig": 1
+                }
+            )
+            
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                abstract = data.get("AbstractText", "")
+                answer = data.get("Answer", "")
+                
+                # Combine available information
+                result_text = answer or abstract or "No specific information found"
+                
+                log.info("   ✅ [SUCCESS] Web search completed")
+                log.info("   Result preview: %s...", result_text[:100])
+                
+                return {
+                    "query": query,
+                    "result": result_text,
+                    "source": "DuckDuckGo",
+                    "success": True
+                }
+            else:
+                log.warning("   ⚠️ [WARNING] Search returned status %s", response.status_code)
+                return {
+                    "query": query,
+                    "result": "Unable to fetch search results",
+                    "success": False
+                }
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    abstract = data.get("AbstractText", "")
-                    answer = data.get("Answer", "")
-                    
-                    # Combine available information
-                    result_text = answer or abstract or "No specific information found"
-                    
-                    print(f"   ✅ [SUCCESS] Web search completed")
-                    print(f"   Result preview: {result_text[:100]}...")
-                    
-                    return {
-                        "query": query,
-                        "result": result_text,
-                        "source": "DuckDuckGo",
-                        "success": True
-                    }
-                else:
-                    print(f"   ⚠️ [WARNING] Search returned status {response.status_code}")
-                    return {
-                        "query": query,
-                        "result": "Unable to fetch search results",
-                        "success": False
-                    }
-                    
         except Exception as e:
-            print(f"   ❌ [TOOL ERROR] web_search failed: {e}")
+            log.error("   ❌ [TOOL ERROR] web_search failed: %s", e)
             return {
                 "query": query,
                 "error": str(e),
@@ -741,10 +928,33 @@ class NomadAgent(Agent):
                 "success": False
             }
     
+    def _spawn_broadcast(self, coro) -> asyncio.Task:
+        """Schedule a data-channel broadcast without blocking the tool result on it"""
+        loop = self._loop or asyncio.get_running_loop()
+        task = loop.create_task(coro)
+        self._pending_bcasts.add(task)
+        task.add_done_callback(self._broadcast_done)
+        return task
+    
+    def _broadcast_done(self, task: asyncio.Task):
+        """Release a finished broadcast and log its failure, since nothing awaits it"""
+        self._pending_bcasts.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.error("   ❌ [BROADCAST ERROR] %s", task.exception(), exc_info=task.exception())
+    
+    async def _broadcast_state(self, state: str):
+        """Broadcast an agent state change (listening/thinking/speaking/idle) to the UI"""
+        await self._send_data_message(_encode_envelope((
+            ("type", "AGENT_STATE"),
+            ("state", state),
+            ("thinking_message", f"Agent is {state}..." if state != "idle" else None),
+        )))
+    
     async def _update_thinking_state(self, message: str, tool_name: str = None):
         """Helper to update thinking state in UI"""
         try:
             if self._room:
+                # Not memoized: thinking messages name the location, so they rarely repeat
                 state_update = {
                     "type": "AGENT_STATE",
                     "state": "thinking",
@@ -764,82 +974,136 @@ class NomadAgent(Agent):
             route_description: Description of the route or trip plan if waypoints are not clear
             route_type: Type of route: 'driving', 'walking', or 'transit'
         """
-        print("=" * 60)
-        print(f"🔧 [TOOL] update_map called!")
-        print(f"   Waypoints: {waypoints}")
-        print(f"   Route type: {route_type}")
-        print("=" * 60)
+        # Fast path: start -> destination is by far the most common call
+        if waypoints and len(waypoints) == 2:
+            return await self._update_map_fast(waypoints, route_description, route_type)
+        
+        log.info("=" * 60)
+        log.info("🔧 [TOOL] update_map called!")
+        log.info("   Waypoints: %s", waypoints)
+        log.info("   Route type: %s", route_type)
+        log.info("=" * 60)
         
         # Update thinking state to show what agent is doing in frontend
         if waypoints and len(waypoints) >= 2:
-            await self._update_thinking_state(
+            self._spawn_broadcast(self._update_thinking_state(
                 f"Planning route from {waypoints[0]} to {waypoints[-1]}...",
                 tool_name="update_map"
-            )
+            ))
         else:
-            await self._update_thinking_state(
+            self._spawn_broadcast(self._update_thinking_state(
                 "Calculating route and updating map...",
                 tool_name="update_map"
-            )
+            ))
         
         if waypoints and len(waypoints) >= 2:
-            print(f"   ✅ Valid route: {waypoints[0]} → {waypoints[-1]}")
+            log.info("   ✅ Valid route: %s → %s", waypoints[0], waypoints[-1])
         elif waypoints and len(waypoints) == 1:
-            print(f"   ⚠️  Only one waypoint provided: {waypoints[0]}")
-            print(f"   💡 Agent should have asked for current location first")
+            log.warning("   ⚠️  Only one waypoint provided: %s", waypoints[0])
+            log.info("   💡 Agent should have asked for current location first")
         else:
-            print(f"   ⚠️  No waypoints provided - route may not display correctly")
+            log.warning("   ⚠️  No waypoints provided - route may not display correctly")
         
         # Ensure MCP client is initialized (try to initialize if not available)
-        if not self.mcp_client:
-            print(f"   ⚠️  [WARNING] MCP client not initialized, attempting to initialize now...")
-            try:
-                from mcp_client import MCPClient
-                self.mcp_client = MCPClient()
-                await self.mcp_client.connect()
-                print(f"   ✅ [SUCCESS] MCP client initialized and connected")
-            except Exception as e:
-                print(f"   ❌ [ERROR] Failed to initialize MCP client: {e}")
-                import traceback
-                traceback.print_exc()
-                return {"error": f"MCP client not initialized: {str(e)}"}
+        error = await self._ensure_mcp_client()
+        if error:
+            return error
         
         if not waypoints:
             waypoints = []
-            print(f"   ⚠️  No waypoints provided, using empty list")
+            log.warning("   ⚠️  No waypoints provided, using empty list")
         
         try:
-            print(f"   📡 [MCP CALL] Calling MCP server update_map endpoint...")
-            print(f"      Request: waypoints={waypoints}, route_type={route_type}")
-            result = await self.mcp_client.call_tool(
-                "update_map",
-                waypoints=waypoints,
-                route_description=route_description,
-                route_type=route_type
-            )
-            print(f"   ✅ [MCP SUCCESS] Route calculated: {len(result.get('path', []))} path points")
-            print(f"      Waypoints processed: {len(result.get('waypoints', []))}")
+            log.info("   📡 [MCP CALL] Calling MCP server update_map endpoint...")
+            log.info("      Request: waypoints=%s, route_type=%s", waypoints, route_type)
+            result = await self.mcp_client.call_tool_payload("update_map", {
+                "waypoints": waypoints,
+                "route_description": route_description,
+                "route_type": route_type
+            })
+            log.info("   ✅ [MCP SUCCESS] Route calculated: %s path points", len(result.get('path', [])))
+            log.info("      Waypoints processed: %s", len(result.get('waypoints', [])))
             if result.get('bounds'):
                 bounds = result['bounds']
-                print(f"      Bounds: N={bounds.get('north')}, S={bounds.get('south')}, E={bounds.get('east')}, W={bounds.get('west')}")
+                log.info("      Bounds: N=%s, S=%s, E=%s, W=%s", bounds.get('north'), bounds.get('south'), bounds.get('east'), bounds.get('west'))
             
-            print(f"   📤 [BROADCAST] Sending route update to frontend via data channel...")
-            await self._broadcast_route_update(result)
-            print(f"   ✅ [SUCCESS] Map update broadcasted to frontend")
-            print(f"   🗺️  [RESULT] Mapbox should now display:")
+            log.info("   📤 [BROADCAST] Sending route update to frontend via data channel...")
+            self._spawn_broadcast(self._broadcast_route_update(result))
+            log.info("   ✅ [SUCCESS] Map update broadcasted to frontend")
+            log.info("   🗺️  [RESULT] Mapbox should now display:")
             if waypoints and len(waypoints) >= 2:
-                print(f"      - Route path line from '{waypoints[0]}' to '{waypoints[-1]}'")
-            print(f"      - Waypoint markers at each location")
-            print(f"      - Map centered on route bounds")
-            print("=" * 60)
+                log.info("      - Route path line from '%s' to '%s'", waypoints[0], waypoints[-1])
+            log.info("      - Waypoint markers at each location")
+            log.info("      - Map centered on route bounds")
+            log.info("=" * 60)
             return result
         except Exception as e:
-            print(f"   ❌ [TOOL ERROR] update_map failed: {e}")
-            import traceback
-            traceback.print_exc()
-            print("=" * 60)
+            log.exception("   ❌ [TOOL ERROR] update_map failed: %s", e)
+            log.info("=" * 60)
             return {"error": str(e)}
     
+    async def _update_map_fast(self, waypoints: list[str], route_description: str, route_type: str) -> dict:
+        """update_map specialized for the common start -> destination case.
+        Repeated routes are served from the LRU route cache without an MCP round-trip
+        (the description doesn't affect a route once waypoints are given, so it isn't keyed).
+        """
+        start, destination = waypoints
+        key = (str(start).strip().lower(), str(destination).strip().lower(), route_type)
+        
+        result = self._route_cache.get(key)
+        if result is not None:
+            self._route_cache.move_to_end(key)
+            log.info("🔧 [TOOL] update_map cache hit: %s → %s", start, destination)
+            self._spawn_broadcast(self._broadcast_route_update(result))
+            return result
+        
+        log.info("🔧 [TOOL] update_map: %s → %s (%s)", start, destination, route_type)
+        self._spawn_broadcast(self._update_thinking_state(
+            f"Planning route from {start} to {destination}...",
+            tool_name="update_map"
+        ))
+        
+        error = await self._ensure_mcp_client()
+        if error:
+            return error
+        
+        try:
+            result = await self.mcp_client.call_tool_payload("update_map", {
+                "waypoints": waypoints,
+                "route_description": route_description,
+                "route_type": route_type
+            })
+        except Exception as e:
+            log.exception("   ❌ [TOOL ERROR] update_map failed: %s", e)
+            return {"error": str(e)}
+        
+        # Only real Directions routes, as on the server: a straight-line fallback also has
+        # a path, but caching it would pin a transient Mapbox failure for the agent's life
+        if "distance" in result:
+            self._route_cache[key] = result
+            if len(self._route_cache) > ROUTE_CACHE_SIZE:
+                self._route_cache.popitem(last=False)
+        
+        self._spawn_broadcast(self._broadcast_route_update(result))
+        return result
+    
+    async def _ensure_mcp_client(self) -> Optional[dict]:
+        """Connect the MCP client if on_enter did not. Returns an error dict on failure."""
+        if self.mcp_client:
+            return None
+        
+        log.warning("   ⚠️  [WARNING] MCP client not initialized, attempting to initialize now...")
+        try:
+            from mcp_client import MCPClient
+            self.mcp_client = MCPClient()
+            await self.mcp_client.connect()
+            log.info("   ✅ [SUCCESS] MCP client initialized and connected")
+            return None
+        except Exception as e:
+            log.exception("   ❌ [ERROR] Failed to initialize MCP client: %s", e)
+            self.mcp_client = None
+            return {"error": f"MCP client not initialized: {str(e)}"}
+    
     async def _ensure_room_access(self):
         """Ensure we have access to the room for publishing data"""
         # If we already have room reference, we're good
@@ -853,17 +1117,17 @@ class NomadAgent(Agent):
             # Method 1: Use stored room reference
             if self._room:
                 room = self._room
-                print(f"   🔌 [DATA] Using stored room reference...")
+                log.info("   🔌 [DATA] Using stored room reference...")
             
             # Method 2: Try to get from session
             elif hasattr(self, 'session') and self.session:
                 try:
                     if hasattr(self.session, 'room'):
                         room = self.session.room
-                        print(f"   🔌 [DATA] Got room from session.room...")
+                        log.info("   🔌 [DATA] Got room from session.room...")
                     elif hasattr(self.session, '_room'):
                         room = self.session._room
-                        print(f"   🔌 [DATA] Got room from session._room...")
+                        log.info("   🔌 [DATA] Got room from session._room...")
                 except AttributeError:
                     pass
             
@@ -873,44 +1137,76 @@ class NomadAgent(Agent):
                     # AgentSession might have agent property
                     if hasattr(self.session, 'agent') and hasattr(self.session.agent, 'room'):
                         room = self.session.agent.room
-                        print(f"   🔌 [DATA] Got room from session.agent.room...")
+                        log.info("   🔌 [DATA] Got room from session.agent.room...")
                 except:
                     pass
             
             if not room:
-                print(f"   ❌ [DATA ERROR] Cannot access room - tried all methods")
-                print(f"      _room: {self._room}")
-                print(f"      session: {hasattr(self, 'session')}")
-                print(f"      session.room: {hasattr(self.session, 'room') if hasattr(self, 'session') and self.session else 'N/A'}")
+                log.error("   ❌ [DATA ERROR] Cannot access room - tried all methods")
+                log.info("      _room: %s", self._room)
+                log.info("      session: %s", hasattr(self, 'session'))
+                log.info("      session.room: %s", hasattr(self.session, 'room') if hasattr(self, 'session') and self.session else 'N/A')
                 return False
             
             # Store room reference for future use
             self._room = room
-            print(f"   ✅ [DATA] Room access confirmed: {room.name}")
+            log.info("   ✅ [DATA] Room access confirmed: %s", room.name)
             return True
             
         except Exception as e:
-            print(f"   ❌ [DATA ERROR] Failed to get room: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("   ❌ [DATA ERROR] Failed to get room: %s", e)
             return False
     
-    async def _send_data_message(self, message: dict):
-        """Send data message via LiveKit publish_data (not data channel)"""
+    async def _send_data_message(self, message: Union[dict, bytes]):
+        """Send data message via LiveKit publish_data (not data channel).
+        Accepts a message dict or an already-encoded payload (see _encode_envelope).
+        
+        Each message is its own frame (with NOMAD_WIRE_FORMAT=msgpack: MSGPACK_FRAME_TAG +
+        the object). With NOMAD_COALESCE_DATA=1, messages queued during the same event-loop
+        tick are published as one frame instead: several are joined as newline-delimited
+        JSON, or concatenated after a single msgpack tag.
+        """
         if not await self._ensure_room_access():
             return False
         
+        try:
+            data_bytes = message if isinstance(message, bytes) else _pack(message)
+        except Exception:
+            log.exception("   ❌ [DATA ERROR] Could not encode %s message", message.get("type"))
+            return False
+        if not _COALESCE_DATA:
+            return await self._publish_frame(MSGPACK_FRAME_TAG + data_bytes if _WIRE_MSGPACK else data_bytes)
+        self._tx_buf.append(data_bytes)
+        if not self._tx_scheduled:
+            self._tx_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush_tx)
+        return True
+    
+    def _flush_tx(self):
+        """Publish everything queued by _send_data_message since the last flush"""
+        buf, self._tx_buf = self._tx_buf, []
+        self._tx_scheduled = False
+        if buf:
+            if _WIRE_MSGPACK:
+                # msgpack objects are self-delimiting, so a batch is just their concatenation
+                payload = MSGPACK_FRAME_TAG + b"".join(buf)
+            else:
+                payload = buf[0] if len(buf) == 1 else b"\n".join(buf)
+            self._spawn_broadcast(self._publish_frame(payload))
+    
+    async def _publish_frame(self, payload: bytes) -> bool:
+        """Publish one data frame to the room"""
         try:
             # Use local_participant.publish_data() instead of data channel
             # publish_data signature: (payload, *, reliable=True, destination_identities=[], topic='')
-            data_bytes = json.dumps(message).encode()
             await self._room.local_participant.publish_data(
-                data_bytes,
+                payload,
                 reliable=True,  # Use reliable=True instead of kind parameter
                 topic="map_updates"  # Optional topic for filtering
             )
             return True
         except Exception as e:
+            log.error("   ❌ [DATA ERROR] publish_data failed: %s", e)
             return False
     
     def _estimate_cost_from_price_tier(self, price_tier: str, item_type: str, location: str = "", item_name: str = "") -> int:
@@ -1016,22 +1312,33 @@ class NomadAgent(Agent):
         NOTE: Cost estimates should already be populated before calling this method.
         """
         if not search_result or "coordinates" not in search_result:
-            print(f"   ⚠️  [MAP UPDATE] No coordinates in search result, skipping broadcast")
+            log.warning("   ⚠️  [MAP UPDATE] No coordinates in search result, skipping broadcast")
+            return
+        if not await self._ensure_room_access():
             return
         
-        map_update = {
-            "type": "MAP_UPDATE",
-            "coordinates": search_result["coordinates"],
-            "data": search_result
-        }
+        last_result, map_update = self._last_map
+        if last_result is not search_result:
+            if _WIRE_MSGPACK:
+                map_update = _pack({
+                    "type": "MAP_UPDATE",
+                    "coordinates": search_result["coordinates"],
+                    "data": search_result
+                })
+            else:
+                map_update = (
+                    self._MAP_PREFIX + orjson.dumps(search_result["coordinates"])
+                    + self._MAP_MID + orjson.dumps(search_result) + self._END
+                )
+            self._last_map = (search_result, map_update)
         
-        print(f"   📤 [MAP UPDATE] Broadcasting map update to frontend...")
-        print(f"      Coordinates: {search_result.get('coordinates')}")
+        log.info("   📤 [MAP UPDATE] Broadcasting map update to frontend...")
+        log.info("      Coordinates: %s", search_result.get('coordinates'))
         
         # Send via publish_data
         success = await self._send_data_message(map_update)
         if not success:
-            print(f"   ❌ [MAP UPDATE ERROR] Failed to send map update")
+            log.error("   ❌ [MAP UPDATE ERROR] Failed to send map update")
     
     async def _send_payment_transaction(self, transaction_data: dict):
         """Send payment transaction to frontend"""
@@ -1040,26 +1347,26 @@ class NomadAgent(Agent):
             "transaction": transaction_data
         }
 
-        print(f"   📤 [PAYMENT] Sending payment transaction to frontend...")
+        log.info("   📤 [PAYMENT] Sending payment transaction to frontend...")
         success = await self._send_data_message(payment_message)
         if not success:
-            print(f"   ❌ [PAYMENT ERROR] Failed to send payment transaction")
+            log.error("   ❌ [PAYMENT ERROR] Failed to send payment transaction")
 
     async def _send_payment_execute(self):
         """Send PAYMENT_EXECUTE message to frontend to trigger wallet popup"""
-        execute_message = {
-            "type": "PAYMENT_EXECUTE"
-        }
+        execute_message = _encode_envelope((("type", "PAYMENT_EXECUTE"),))
 
-        print(f"   📤 [PAYMENT EXECUTE] Triggering wallet popup on frontend...")
+        log.info("   📤 [PAYMENT EXECUTE] Triggering wallet popup on frontend...")
         success = await self._send_data_message(execute_message)
         if not success:
-            print(f"   ❌ [PAYMENT EXECUTE ERROR] Failed to send payment execute message")
+            log.error("   ❌ [PAYMENT EXECUTE ERROR] Failed to send payment execute message")
 
     async def _broadcast_route_update(self, route_data: dict):
         """Broadcast route update to map via LiveKit data publishing"""
         if not route_data:
-            print("   ⚠️ [ROUTE BROADCAST] No route data to broadcast")
+            log.warning("   ⚠️ [ROUTE BROADCAST] No route data to broadcast")
+            return
+        if not await self._ensure_room_access():
             return
         
         # Ensure route_data has the structure frontend expects
@@ -1068,13 +1375,18 @@ class NomadAgent(Agent):
         waypoints = route_data.get("waypoints", [])
         bounds = route_data.get("bounds", {})
         
-        print(f"   📤 [ROUTE BROADCAST] Preparing route update:")
-        print(f"      Path points: {len(path)}")
-        print(f"      Waypoints: {len(waypoints)}")
-        print(f"      Has bounds: {bool(bounds)}")
+        log.info("   📤 [ROUTE BROADCAST] Preparing route update:")
+        log.info("      Path points: %s", len(path))
+        log.info("      Waypoints: %s", len(waypoints))
+        log.info("      Has bounds: %s", bool(bounds))
         if path and len(path) > 0:
-            print(f"      First path point: {path[0]}")
-            print(f"      Last path point: {path[-1]}")
+            log.info("      First path point: %s", path[0])
+            log.info("      Last path point: %s", path[-1])
+        
+        last_route, route_update = self._last_route
+        if last_route is route_data:
+            await self._send_data_message(route_update)
+            return
         
         # Ensure path is in correct format: array of [lat, lng] arrays
         if path and len(path) > 0:
@@ -1085,38 +1397,57 @@ class NomadAgent(Agent):
                     # Ensure it's [lat, lng] format
                     formatted_path.append([float(point[0]), float(point[1])])
                 else:
-                    print(f"   ⚠️ [ROUTE] Invalid path point format: {point}")
+                    log.warning("   ⚠️ [ROUTE] Invalid path point format: %s", point)
             path = formatted_path
         
-        route_update = {
-            "type": "ROUTE_UPDATE",
-            "route": {
-                "path": path,  # Array of [lat, lng]
-                "waypoints": waypoints,  # Array of {location, coordinates}
-                "bounds": bounds,  # {north, south, east, west}
-                "route_type": route_data.get("route_type", "driving")
-            },
-            "waypoints": waypoints,  # Also include at top level for markers
-            "path": path,  # Also include at top level
-            "bounds": bounds  # Also include at top level
+        route = {
+            "path": path,  # Array of [lat, lng]
+            "waypoints": waypoints,  # Array of {location, coordinates}
+            "bounds": bounds,  # {north, south, east, west}
+            "route_type": route_data.get("route_type", "driving")
         }
+        # waypoints/path/bounds are also included at top level for markers
+        if _WIRE_MSGPACK:
+            route_update = _pack({
+                "type": "ROUTE_UPDATE",
+                "route": route,
+                "waypoints": waypoints,
+                "path": path,
+                "bounds": bounds
+            })
+        else:
+            route_update = (
+                self._ROUTE_PREFIX + orjson.dumps(route)
+                + self._ROUTE_WAYPOINTS + orjson.dumps(waypoints)
+                + self._ROUTE_PATH + orjson.dumps(path)
+                + self._ROUTE_BOUNDS + orjson.dumps(bounds) + self._END
+            )
+        self._last_route = (route_data, route_update)
         
         # Send via publish_data
         await self._send_data_message(route_update)
 
 
+def prewarm(proc: JobProcess):
+    """Load heavy models once per worker process, before any job is assigned.
+    Silero VAD deserializes a torch model, which would otherwise add several
+    hundred ms to every room join.
+    """
+    proc.userdata["vad"] = silero.VAD.load()
+
+
 async def entrypoint(ctx: JobContext):
     """Entry point for the LiveKit agent - STANDARD PATTERN"""
-    print("=" * 60)
-    print("🚀 Nomad Agent Starting...")
-    print("=" * 60)
+    log.info("=" * 60)
+    log.info("🚀 Nomad Agent Starting...")
+    log.info("=" * 60)
     
     try:
         # Connect to room with auto-subscribe to audio
-        print("📡 Connecting to LiveKit room...")
+        log.info("📡 Connecting to LiveKit room...")
         await ctx.connect(auto_subscribe=AutoSubscribe.AUDIO_ONLY)
-        print(f"   ✅ Connected to room: {ctx.room.name}")
-        print(f"   Agent identity: {ctx.room.local_participant.identity}")
+        log.info("   ✅ Connected to room: %s", ctx.room.name)
+        log.info("   Agent identity: %s", ctx.room.local_participant.identity)
         
         # CRITICAL: Check if there's already another agent in the room
         # Only allow 1 agent per room
@@ -1126,25 +1457,25 @@ async def entrypoint(ctx: JobContext):
         ]
         
         if existing_agents:
-            print(f"   ⚠️  ANOTHER AGENT ALREADY IN ROOM: {[a.identity for a in existing_agents]}")
-            print(f"   🚫 Disconnecting to maintain single-agent policy...")
+            log.warning("   ⚠️  ANOTHER AGENT ALREADY IN ROOM: %s", [a.identity for a in existing_agents])
+            log.info("   🚫 Disconnecting to maintain single-agent policy...")
             await ctx.room.disconnect()
             return  # Exit early - don't start this agent
         
-        print(f"   ✅ No other agents in room - proceeding as the sole agent")
+        log.info("   ✅ No other agents in room - proceeding as the sole agent")
         
         # Configure STT
-        print("🎤 Configuring Deepgram STT...")
+        log.info("🎤 Configuring Deepgram STT...")
         stt = DeepgramSTT(
-            api_key=os.getenv("DEEPGRAM_API_KEY"),
+            api_key=_DEEPGRAM_KEY,
             model="nova-2",
             language="en-US",
             smart_format=True,
         )
         
         # Configure TTS with a specific voice model
-        print("🔊 Configuring Deepgram TTS...")
-        deepgram_key = os.getenv("DEEPGRAM_API_KEY")
+        log.info("🔊 Configuring Deepgram TTS...")
+        deepgram_key = _DEEPGRAM_KEY
         if not deepgram_key:
             raise ValueError("DEEPGRAM_API_KEY not found in environment variables!")
         
@@ -1155,81 +1486,95 @@ async def entrypoint(ctx: JobContext):
             model="aura-asteria-en",  # Smooth, professional female voice
             sample_rate=24000,  # Standard sample rate for quality
         )
-        print(f"   ✅ TTS model: aura-asteria-en (Deepgram)")
-        print(f"   ✅ TTS API key: {deepgram_key[:10]}...{deepgram_key[-4:]}")
+        log.info("   ✅ TTS model: aura-asteria-en (Deepgram)")
+        log.info("   ✅ TTS API key: %s...%s", deepgram_key[:10], deepgram_key[-4:])
         
-        # Configure VAD
-        print("👂 Loading Silero VAD...")
-        vad = silero.VAD.load()
+        # Configure VAD (normally loaded once per worker process by prewarm)
+        vad = ctx.proc.userdata.get("vad")
+        if vad is None:
+            log.info("👂 Loading Silero VAD...")
+            vad = silero.VAD.load()
         
-        # Configure LLM
-        print("🧠 Configuring LLM...")
-        llm_provider = os.getenv("LLM_PROVIDER", "anthropic").lower().strip()
+        # Configure LLM. parallel_tool_calls lets one turn request e.g. restaurants and
+        # activities together; AgentSession then runs those tool calls concurrently.
+        log.info("🧠 Configuring LLM...")
+        llm_provider = _LLM_PROVIDER
         
         if llm_provider == "anthropic" or llm_provider == "":
-            anthropic_key = os.getenv("ANTHROPIC_API_KEY")
+            anthropic_key = _ANTHROPIC_KEY
             if not anthropic_key:
                 raise ValueError("ANTHROPIC_API_KEY not found in environment variables.")
             llm_instance = anthropic.LLM(
                 model="claude-sonnet-4-5-20250929",
                 api_key=anthropic_key,
+                parallel_tool_calls=True,
             )
-            print("   ✅ Using Anthropic Claude Sonnet 4.5")
+            log.info("   ✅ Using Anthropic Claude Sonnet 4.5")
         elif llm_provider == "openai":
-            openai_key = os.getenv("OPENAI_API_KEY")
+            openai_key = _OPENAI_KEY
             if not openai_key:
                 raise ValueError("OPENAI_API_KEY not found in environment variables.")
-            llm_instance = openai.LLM(model="gpt-4o", api_key=openai_key)
-            print("   ✅ Using OpenAI GPT-4o")
+            llm_instance = openai.LLM(model="gpt-4o", api_key=openai_key, parallel_tool_calls=True)
+            log.info("   ✅ Using OpenAI GPT-4o")
         else:
             raise ValueError(f"Invalid LLM_PROVIDER: '{llm_provider}'")
         
         # Create agent
-        print("🤖 Creating NomadAgent...")
+        log.info("🤖 Creating NomadAgent...")
         agent = NomadAgent(instructions=SYSTEM_PROMPT)
         agent._room = ctx.room
         
         # Create session
-        print("📋 Creating AgentSession...")
+        log.info("📋 Creating AgentSession...")
         session = AgentSession(vad=vad, stt=stt, llm=llm_instance, tts=tts)
         
         # Log conversation items with detailed debugging
         @session.on("conversation_item_added")
         def on_conversation_item_added(event: ConversationItemAddedEvent):
-            role = event.item.role
-            text = event.item.text_content
             item = event.item
+            role = item.role
+            text = item.text_content
             
-            print("=" * 60)
-            print(f"📝 [CONVERSATION ITEM ADDED]")
-            print(f"   Role: {role}")
-            print(f"   Text: \"{text}\"")
-            
-            # Log additional item details
-            if hasattr(item, 'id'):
-                print(f"   Item ID: {item.id}")
-            if hasattr(item, 'type'):
-                print(f"   Type: {item.type}")
-            
-            # Check for tool calls in the item
-            if hasattr(item, 'tool_calls') and item.tool_calls:
-                print(f"   🔧 Tool Calls: {len(item.tool_calls)}")
-                for tc in item.tool_calls:
-                    tc_name = getattr(tc, 'name', None) or getattr(tc, 'function_name', 'unknown')
-                    tc_args = getattr(tc, 'arguments', None) or getattr(tc, 'args', {})
-                    print(f"      - {tc_name}({tc_args})")
-            
-            # Check for function call info
-            if hasattr(item, 'function_call') and item.function_call:
-                fn = item.function_call
-                fn_name = getattr(fn, 'name', 'unknown')
-                fn_args = getattr(fn, 'arguments', {})
-                print(f"   🔧 Function Call: {fn_name}({fn_args})")
+            if _DEBUG:
+                log.info("=" * 60)
+                log.info("📝 [CONVERSATION ITEM ADDED]")
+                log.info("   Role: %s", role)
+                log.info('   Text: "%s"', text)
+                
+                # Log additional item details (single attribute load each; missing
+                # attributes are the rare case, so EAFP beats hasattr + getattr)
+                item_id = getattr(item, 'id', None)
+                if item_id is not None:
+                    log.info("   Item ID: %s", item_id)
+                item_type = getattr(item, 'type', None)
+                if item_type is not None:
+                    log.info("   Type: %s", item_type)
+                
+                # Check for tool calls in the item
+                tool_calls = getattr(item, 'tool_calls', None)
+                if tool_calls:
+                    log.info("   🔧 Tool Calls: %s", len(tool_calls))
+                    for tc in tool_calls:
+                        tc_name = getattr(tc, 'name', None) or getattr(tc, 'function_name', 'unknown')
+                        tc_args = getattr(tc, 'arguments', None) or getattr(tc, 'args', {})
+                        log.info("      - %s(%s)", tc_name, tc_args)
+                
+                # Check for function call info
+                try:
+                    fn = item.function_call
+                    fn_name = fn.name
+                    fn_args = fn.arguments
+                except AttributeError:
+                    fn = None
+                if fn:
+                    log.info("   🔧 Function Call: %s(%s)", fn_name, fn_args)
             
             if role == "user":
-                print(f"👤 [USER MESSAGE] \"{text}\"")
+                if _DEBUG:
+                    log.info('👤 [USER MESSAGE] "%s"', text)
             elif role == "assistant":
-                print(f"🤖 [AGENT RESPONSE] \"{text}\"")
+                if _DEBUG:
+                    log.info('🤖 [AGENT RESPONSE] "%s"', text)
                 # Send agent transcript to frontend for display
                 if text and len(text.strip()) > 0:
                     asyncio.create_task(agent._send_data_message({
@@ -1239,77 +1584,81 @@ async def entrypoint(ctx: JobContext):
                         "timestamp": int(time.time() * 1000)
                     }))
             elif role == "tool" or role == "function":
-                print(f"🔧 [TOOL RESULT] {text}")
+                if _DEBUG:
+                    log.info("🔧 [TOOL RESULT] %s", text)
             
-            print("=" * 60)
+            if _DEBUG:
+                log.info("=" * 60)
         
         # Log when agent starts/stops speaking
         @session.on("agent_speech_started")
         def on_agent_speech_started(event):
-            print("\n" + "=" * 60)
-            print("🔊 [AGENT SPEAKING] Started speaking...")
-            print(f"   Audio track should be publishing to room: {ctx.room.name}")
+            if not _DEBUG:
+                return
+            log.info("\n" + "=" * 60)
+            log.info("🔊 [AGENT SPEAKING] Started speaking...")
+            log.info("   Audio track should be publishing to room: %s", ctx.room.name)
             # Check if audio track is published
             local_participant = ctx.room.local_participant
             audio_tracks = list(local_participant.track_publications.values())
             audio_count = sum(1 for t in audio_tracks if t.kind == rtc.TrackKind.KIND_AUDIO)
-            print(f"   Published audio tracks: {audio_count}")
-            print("=" * 60)
+            log.info("   Published audio tracks: %s", audio_count)
+            log.info("=" * 60)
         
         @session.on("agent_speech_stopped")  
         def on_agent_speech_stopped(event):
-            print("🔊 [AGENT SPEAKING] Stopped speaking")
+            if _DEBUG:
+                log.info("🔊 [AGENT SPEAKING] Stopped speaking")
         
         # Log track publishing events
         @ctx.room.on("track_published")
         def on_track_published(publication, participant):
-            print(f"📡 [TRACK PUBLISHED] {publication.kind} track by {participant.identity}")
+            if _DEBUG:
+                log.info("📡 [TRACK PUBLISHED] %s track by %s", publication.kind, participant.identity)
         
         @ctx.room.on("local_track_published")
         def on_local_track_published(publication):
-            print(f"📡 [LOCAL TRACK] Agent published {publication.kind} track: {publication.sid}")
+            if _DEBUG:
+                log.info("📡 [LOCAL TRACK] Agent published %s track: %s", publication.kind, publication.sid)
         
         # Log function/tool calls from the LLM
         @session.on("function_calls_started")
         def on_function_calls_started(event):
-            print("\n" + "=" * 60)
-            print("🔧 [LLM TOOL CALLS] Agent is calling tools...")
+            if not _DEBUG:
+                return
+            log.info("\n" + "=" * 60)
+            log.info("🔧 [LLM TOOL CALLS] Agent is calling tools...")
             if hasattr(event, 'function_calls'):
                 for fc in event.function_calls:
                     name = getattr(fc, 'name', 'unknown')
                     args = getattr(fc, 'arguments', {})
-                    print(f"   - {name}({args})")
-            print("=" * 60)
+                    log.info("   - %s(%s)", name, args)
+            log.info("=" * 60)
         
         @session.on("function_calls_completed")
         def on_function_calls_completed(event):
-            print("🔧 [LLM TOOL CALLS] Tool calls completed")
+            if _DEBUG:
+                log.info("🔧 [LLM TOOL CALLS] Tool calls completed")
         
         # Broadcast agent state to frontend
         @session.on("agent_state_changed")
         def on_agent_state_changed(event: AgentStateChangedEvent):
             state = event.new_state
-            print(f"\n🔄 [AGENT STATE] {state.upper()}")
-            
-            async def broadcast():
-                try:
-                    await agent._send_data_message({
-                        "type": "AGENT_STATE",
-                        "state": state,
-                        "thinking_message": f"Agent is {state}..." if state != "idle" else None
-                    })
-                except:
-                    pass
+            if _DEBUG:
+                log.info("\n🔄 [AGENT STATE] %s", state.upper())
             
+            # A state change emitted with no running event loop (e.g. after the session
+            # loop has shut down) can't schedule a broadcast, so it is dropped
             try:
-                asyncio.get_running_loop().create_task(broadcast())
-            except:
-                pass
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            agent._spawn_broadcast(agent._broadcast_state(state))
         
         # Start session - AgentSession handles audio subscription automatically
-        print("🚀 Starting agent session...")
-        print("   ✅ Audio input: enabled (listening to user)")
-        print("   ✅ Audio output: enabled (agent will speak)")
+        log.info("🚀 Starting agent session...")
+        log.info("   ✅ Audio input: enabled (listening to user)")
+        log.info("   ✅ Audio output: enabled (agent will speak)")
         
         # Configure room options - enable audio input and output
         room_options = room_io.RoomOptions(
@@ -1324,54 +1673,52 @@ async def entrypoint(ctx: JobContext):
         )
         
         # Verify audio is properly set up
-        print(f"   📡 Room state: {ctx.room.connection_state}")
-        print(f"   📡 Local participant: {ctx.room.local_participant.identity}")
+        log.info("   📡 Room state: %s", ctx.room.connection_state)
+        log.info("   📡 Local participant: %s", ctx.room.local_participant.identity)
         
         # Send initial greeting AFTER session starts
-        print("🔊 Speaking initial greeting...")
+        log.info("🔊 Speaking initial greeting...")
         try:
             await session.say(
                 "Hello! I'm your Nomad travel assistant. I'm here to help you plan your next adventure. Where would you like to go today?",
                 allow_interruptions=True
             )
-            print("   ✅ Initial greeting spoken via session.say()")
+            log.info("   ✅ Initial greeting spoken via session.say()")
         except Exception as greeting_err:
-            print(f"   ⚠️ session.say() failed: {greeting_err}")
+            log.warning("   ⚠️ session.say() failed: %s", greeting_err)
             # Fallback to generate_reply
             try:
                 await session.generate_reply(
                     instructions="Greet the user warmly and say you're the Nomad travel assistant ready to help plan their trip"
                 )
-                print("   ✅ Initial greeting via generate_reply()")
+                log.info("   ✅ Initial greeting via generate_reply()")
             except Exception as e2:
-                print(f"   ⚠️ generate_reply() also failed: {e2}")
-        
-        print("\n" + "=" * 60)
-        print("✅ AGENT READY - LISTENING FOR SPEECH")
-        print("=" * 60)
-        print(f"   Room: {ctx.room.name}")
-        print(f"   LLM: {llm_provider.upper()}")
-        print("")
-        print("   📝 DEBUG LOG KEY:")
-        print("   ─────────────────────────────────")
-        print("   🎧 [HEARD]              = User speech detected")
-        print("   🎯 [INTENT]             = Detected user intent")
-        print("   🧠 [LLM]                = LLM processing")
-        print("   🔧 [TOOL CALLED]        = Agent is calling a tool")
-        print("   📝 [CONVERSATION ITEM]  = Message added to conversation")
-        print("   🤖 [AGENT RESPONSE]     = What agent will say")
-        print("   🔊 [SPEAKING]           = Agent is speaking")
-        print("   🔄 [STATE]              = Agent state change")
-        print("   📤 [BROADCAST]          = Sending data to frontend")
-        print("=" * 60)
-        print("")
-        print("👂 Waiting for user to speak...")
-        print("")
+                log.warning("   ⚠️ generate_reply() also failed: %s", e2)
+        
+        log.info("\n" + "=" * 60)
+        log.info("✅ AGENT READY - LISTENING FOR SPEECH")
+        log.info("=" * 60)
+        log.info("   Room: %s", ctx.room.name)
+        log.info("   LLM: %s", llm_provider.upper())
+        log.info("")
+        log.info("   📝 DEBUG LOG KEY:")
+        log.info("   ─────────────────────────────────")
+        log.info("   🎧 [HEARD]              = User speech detected")
+        log.info("   🎯 [INTENT]             = Detected user intent")
+        log.info("   🧠 [LLM]                = LLM processing")
+        log.info("   🔧 [TOOL CALLED]        = Agent is calling a tool")
+        log.info("   📝 [CONVERSATION ITEM]  = Message added to conversation")
+        log.info("   🤖 [AGENT RESPONSE]     = What agent will say")
+        log.info("   🔊 [SPEAKING]           = Agent is speaking")
+        log.info("   🔄 [STATE]              = Agent state change")
+        log.info("   📤 [BROADCAST]          = Sending data to frontend")
+        log.info("=" * 60)
+        log.info("")
+        log.info("👂 Waiting for user to speak...")
+        log.info("")
         
     except Exception as e:
-        print(f"❌ [ERROR] {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("❌ [ERROR] %s", e)
         raise
 
 
@@ -1388,6 +1735,7 @@ if __name__ == "__main__":
     # Configure worker to only run 1 agent at a time
     worker_options = WorkerOptions(
         entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm,  # Load Silero VAD before jobs arrive
         num_idle_processes=1,  # Only keep 1 idle process
         agent_name="nomad-agent",  # CRITICAL: Must match frontend dispatch name
     )
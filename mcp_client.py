@@ -4,9 +4,12 @@ MCP Client for communicating with the FastMCP tool server
 
 import os
 import aiohttp
-import json
+import orjson
 from typing import Dict, Any, Optional
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_ACCEPT_JSON = {"Accept": "application/json"}
+
 
 class MCPClient:
     """Client for interacting with the MCP tool server"""
@@ -14,10 +17,20 @@ class MCPClient:
     def __init__(self, server_url: Optional[str] = None):
         self.server_url = server_url or os.getenv("MCP_SERVER_URL", "http://localhost:8000")
         self.session: Optional[aiohttp.ClientSession] = None
+        self._tool_url_fmt = f"{self.server_url}/tools/{{}}"
     
     async def connect(self):
-        """Initialize the HTTP session"""
-        self.session = aiohttp.ClientSession()
+        """Initialize the HTTP session (one keep-alive pool reused for the agent's lifetime)"""
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=32,
+                limit_per_host=16,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+            ),
+            # Server-side Yelp calls allow 15s each, so leave headroom above that
+            timeout=aiohttp.ClientTimeout(total=30),
+        )
     
     async def disconnect(self):
         """Close the HTTP session"""
@@ -26,21 +39,30 @@ class MCPClient:
     
     async def call_tool(self, tool_name: str, **kwargs) -> Dict[str, Any]:
         """Call a tool on the MCP server"""
+        return await self.call_tool_payload(tool_name, kwargs)
+    
+    async def call_tool_payload(self, tool_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Call a tool on the MCP server with a prebuilt JSON body dict"""
         if not self.session:
             await self.connect()
         
-        url = f"{self.server_url}/tools/{tool_name}"
+        url = self._tool_url_fmt.format(tool_name)
         
         try:
-            async with self.session.post(url, json=kwargs) as response:
+            async with self.session.post(url, data=orjson.dumps(payload), headers=_JSON_HEADERS) as response:
                 if response.status == 200:
-                    return await response.json()
+                    return orjson.loads(await response.read())
                 else:
                     error_text = await response.text()
                     raise Exception(f"MCP server error: {error_text}")
         except aiohttp.ClientError as e:
             raise Exception(f"Failed to call MCP tool {tool_name}: {e}")
     
+    async def call_tools_batch(self, calls: list) -> list:
+        """Run several {"tool", "params"} calls in one request; results come back in order"""
+        result = await self.call_tool_payload("batch", calls)
+        return result["results"]
+    
     async def list_tools(self) -> list:
         """List available tools from the MCP server"""
         if not self.session:
@@ -49,9 +71,9 @@ class MCPClient:
         url = f"{self.server_url}/tools"
         
         try:
-            async with self.session.get(url) as response:
+            async with self.session.get(url, headers=_ACCEPT_JSON) as response:
                 if response.status == 200:
-                    return await response.json()
+                    return orjson.loads(await response.read())
                 else:
                     return []
         except aiohttp.ClientError:
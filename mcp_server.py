@@ -4,15 +4,36 @@ Provides travel search tools: Yelp, Tripadvisor, Hotels
 Uses Yelp MCP Server for real-time business data
 """
 
+import asyncio
+import atexit
+import hashlib
+import logging
+import logging.handlers
 import os
+import queue
+import re
 import sys
-from typing import Optional
+import unicodedata
+from contextlib import asynccontextmanager
+from functools import lru_cache, partial, wraps
+from typing import Annotated, Optional, Union
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import Body, FastAPI, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+from starlette.exceptions import HTTPException as StarletteHTTPException
 import aiohttp
-import json
+import httpx
+from cachetools import LRUCache, TTLCache
+import importlib.util
+import itertools
+import numpy as np
+import orjson
+import yarl
 
 # Import Solana vendor wallet functions
 from solana_payment import initialize_vendor_wallet, get_vendor_public_key
@@ -20,6 +41,26 @@ from solana_payment import initialize_vendor_wallet, get_vendor_public_key
 # Load environment variables from .env file
 load_dotenv()
 
+# Per-request logs (geocoding, directions, Yelp, tool handlers) go through logging so
+# DEBUG lines are never formatted unless enabled (NOMAD_LOG_LEVEL=DEBUG). Log calls only
+# enqueue the record; formatting and the stdout write happen on the listener's thread,
+# so a slow pipe never blocks the event loop (same setup as agent.py)
+log = logging.getLogger("nomad.mcp_server")
+_log_level = os.getenv("NOMAD_LOG_LEVEL", "INFO").upper()
+# An unknown level name (e.g. "verbose") falls back to INFO instead of failing the import
+_log_level_valid = isinstance(logging.getLevelName(_log_level), int)
+log.setLevel(_log_level if _log_level_valid else logging.INFO)
+_log_handler = logging.StreamHandler(sys.stdout)
+_log_handler.setFormatter(logging.Formatter("%(message)s"))
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)  # Drain queued records before the process exits
+log.addHandler(logging.handlers.QueueHandler(_log_queue))
+log.propagate = False
+if not _log_level_valid:
+    log.warning("⚠️ Unknown NOMAD_LOG_LEVEL %r - using INFO", _log_level)
+
 # Add yelp-mcp to Python path for importing
 YELP_MCP_PATH = os.path.join(os.path.dirname(__file__), "yelp-mcp", "src")
 if YELP_MCP_PATH not in sys.path:
@@ -30,32 +71,107 @@ try:
     from yelp_agent.api import make_fusion_ai_request, UserContext
     from yelp_agent.formatters import format_fusion_ai_response
     YELP_MCP_AVAILABLE = True
-    print("✅ Yelp MCP module loaded successfully")
+    log.info("✅ Yelp MCP module loaded successfully")
 except ImportError as e:
-    print(f"⚠️ Could not import yelp-mcp: {e}")
+    log.warning("⚠️ Could not import yelp-mcp: %s", e)
     YELP_MCP_AVAILABLE = False
 
 # Mapbox API configuration
 MAPBOX_ACCESS_TOKEN = os.getenv("MAPBOX_ACCESS_TOKEN") or os.getenv("NEXT_PUBLIC_MAPBOX_TOKEN")
 MAPBOX_DIRECTIONS_API = "https://api.mapbox.com/directions/v5"
 MAPBOX_GEOCODING_API = "https://api.mapbox.com/geocoding/v5/mapbox.places"
+MAPBOX_GEOCODING_URL = yarl.URL(MAPBOX_GEOCODING_API)
+MAPBOX_BATCH_GEOCODING_URL = yarl.URL("https://api.mapbox.com/search/geocode/v6/batch")
+# route_type -> Mapbox Directions profile (must include "mapbox/" prefix)
+PROFILE_MAP = {
+    "driving": "mapbox/driving",
+    "walking": "mapbox/walking",
+    "cycling": "mapbox/cycling",
+    "transit": "mapbox/driving",  # Mapbox doesn't have transit, use driving
+}
+DEFAULT_PROFILE = "mapbox/driving"
+# Directions API limit on coordinates per request (longer routes use the fallback path)
+MAPBOX_MAX_COORDINATES = 25
+# Invariant Directions query params; the access token is added per call
+_ROUTE_PARAMS_BASE = {
+    # Encoded polyline (1e-6 precision): ~4x smaller than GeoJSON float arrays
+    "geometries": "polyline6",
+    "overview": "full",  # Get full geometry for detailed route
+}
+# Caps on a Mapbox call so a degraded API can't stall a tool request (falls back instead)
+MAPBOX_TIMEOUT = aiohttp.ClientTimeout(total=8, connect=2, sock_read=5)
+# Max Mapbox requests in flight across all tool calls (match the account's rate limit)
+MAPBOX_MAX_CONCURRENCY = int(os.getenv("MAPBOX_MAX_CONCURRENCY", "10"))
+# Rate-limited (429) requests are retried this many times with exponential backoff
+MAPBOX_MAX_RETRIES = 3
+MAPBOX_MAX_BACKOFF = 4.0  # seconds
+
+# Max tool calls accepted in one /tools/batch request
+TOOL_BATCH_MAX_CALLS = 32
 
 # Yelp Fusion AI API configuration
 YELP_API_KEY = os.getenv("YELP_API_KEY")
+# Max Yelp searches in flight across all tool calls, so /tools/batch fan-outs stay
+# within Yelp's rate limit instead of tipping every call into the v3 fallback
+YELP_MAX_CONCURRENCY = int(os.getenv("YELP_MAX_CONCURRENCY", "10"))
 
 # Log API configurations
 if MAPBOX_ACCESS_TOKEN:
-    print(f"✅ Mapbox token configured: {MAPBOX_ACCESS_TOKEN[:10]}...")
+    log.info("✅ Mapbox token configured: %s...", MAPBOX_ACCESS_TOKEN[:10])
 else:
-    print("⚠️ WARNING: No Mapbox token found! Set MAPBOX_ACCESS_TOKEN or NEXT_PUBLIC_MAPBOX_TOKEN in .env")
+    log.warning("⚠️ WARNING: No Mapbox token found! Set MAPBOX_ACCESS_TOKEN or NEXT_PUBLIC_MAPBOX_TOKEN in .env")
 
 if YELP_API_KEY:
-    print(f"✅ Yelp API key configured: {YELP_API_KEY[:10]}...")
+    log.info("✅ Yelp API key configured: %s...", YELP_API_KEY[:10])
 else:
-    print("⚠️ WARNING: No Yelp API key found! Set YELP_API_KEY in .env for restaurant/business search")
+    log.warning("⚠️ WARNING: No Yelp API key found! Set YELP_API_KEY in .env for restaurant/business search")
+
+class OrjsonResponse(JSONResponse):
+    """JSON response rendered by orjson (C), including numpy arrays and scalars natively"""
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
 
 # Initialize FastAPI server
-app = FastAPI(title="NomadSync Travel Tools MCP Server")
+# Responses are encoded by orjson (C) rather than stdlib json
+app = FastAPI(title="NomadSync Travel Tools MCP Server", default_response_class=OrjsonResponse)
+
+
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request: Request, exc: StarletteHTTPException):
+    """Error bodies go through orjson too, same shape as FastAPI's default handler"""
+    return OrjsonResponse({"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers)
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """Malformed request bodies, rendered by orjson. Tool endpoints answer 400 as they did
+    before their params were pydantic models (e.g. a missing location); others keep 422
+    """
+    status_code = 400 if request.url.path.startswith("/tools/") else 422
+    return OrjsonResponse({"detail": jsonable_encoder(exc.errors())}, status_code=status_code)
+
+
+# Tool name -> (tool function, params model), filled by _tool_route for /tools/batch
+TOOLS: dict[str, tuple] = {}
+
+
+def _tool_route(path: str):
+    """
+    Register an async tool function as a POST endpoint. The endpoint hands back an
+    already-built OrjsonResponse, so FastAPI skips its jsonable_encoder walk over large
+    path/coordinate arrays; the decorated function itself still returns a plain dict.
+    """
+    def decorator(func):
+        @wraps(func)
+        async def endpoint(params):
+            return OrjsonResponse(await func(params))
+        
+        app.post(path, response_model=None)(endpoint)
+        TOOLS[func.__name__] = (func, func.__annotations__["params"])
+        return func
+    return decorator
 
 # Add CORS middleware to allow frontend requests
 app.add_middleware(
@@ -64,37 +180,398 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
+)
+
+
+# Compress JSON payloads on the wire; empty 304s from /tools pass through untouched.
+# Optional: Brotli (pip install brotli-asgi), which still serves gzip to clients without br
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, quality=4, minimum_size=500)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=500)
+
+
+# Static pieces of the tool responses, built once at import instead of per business
+PLACEHOLDER_IMAGE_URL = "https://via.placeholder.com/300x200"
+RESTAURANT_SEARCH_URL = "https://yelp.com/search?find_desc=restaurant&find_loc={}"
+ACTIVITY_SEARCH_URL = "https://yelp.com/search?find_desc=things+to+do&find_loc={}"
+HOTEL_SEARCH_URL = "https://yelp.com/search?find_desc=hotels&find_loc={}"
+
+# Response field -> Yelp attribute (False when absent) for restaurants and activities
+RESTAURANT_ATTR_FIELDS = (
+    ("delivery", "RestaurantsDelivery"),
+    ("takeout", "RestaurantsTakeOut"),
+    ("reservations", "RestaurantsReservations"),
+    ("outdoor_seating", "OutdoorSeating"),
+)
+ACTIVITY_ATTR_FIELDS = (
+    ("wheelchair_accessible", "WheelchairAccessible"),
+    ("good_for_kids", "GoodForKids"),
+)
+
+# Yelp attribute -> amenity label shown for hotels
+HOTEL_AMENITY_ATTRS = (
+    ("BusinessParking", "Parking"),
+    ("WheelchairAccessible", "Accessible"),
+    ("DogsAllowed", "Pet Friendly"),
 )
 
 
+def _strip_highlights(snippet: str) -> str:
+    """Remove Yelp's [[HIGHLIGHT]] markers from a review snippet"""
+    if not snippet:
+        return snippet
+    return snippet.replace("[[HIGHLIGHT]]", "").replace("[[ENDHIGHLIGHT]]", "")
+
+
+def _business_coords(coords, lat: float, lng: float) -> list:
+    """[lat, lng] of a business from Yelp's list or dict coordinates, else the searched location"""
+    if isinstance(coords, list) and len(coords) >= 2:
+        return [coords[0] if coords[0] is not None else lat, coords[1] if coords[1] is not None else lng]
+    if isinstance(coords, dict):
+        return [coords.get("latitude", lat), coords.get("longitude", lng)]
+    return [lat, lng]
+
+
+def _business_fields(biz: dict, default_name: str, lat: float, lng: float, fallback_url: str, near_location: list, attr_fields: tuple = ()) -> dict:
+    """
+    Fields every search tool builds from a Yelp business; each tool adds its own to the
+    returned dict in place.
+    
+    Args:
+        biz: Business from Yelp Fusion AI or v3 search
+        default_name: Name used when Yelp omits one
+        lat, lng: Searched location, used when the business has no coordinates
+        fallback_url: Yelp search URL used when the business has no URL
+        near_location: Address lines used when the business has no address
+        attr_fields: (field, Yelp attribute) pairs copied from the business attributes
+    """
+    get = biz.get
+    
+    # Get location info
+    location_info = get("location", {})
+    address = location_info.get("formatted_address", "")
+    if not address:
+        address = ", ".join(location_info.get("display_address", near_location))
+    
+    # Get contextual info (hours, reviews, photos); only the first 3 photos are used
+    contextual = get("contextual_info", {})
+    photo_urls = list(itertools.islice(
+        filter(None, (p.get("original_url") for p in contextual.get("photos", []))), 3
+    ))
+    attributes = get("attributes", {})
+    
+    fields = {
+        "name": get("name", default_name),
+        "rating": get("rating", 0),
+        "review_count": get("review_count", 0),
+        "address": address,
+        "phone": get("phone", get("display_phone", "")),
+        "coordinates": _business_coords(get("coordinates"), lat, lng),
+        "yelp_url": get("url", fallback_url),
+        "image_url": get("image_url", photo_urls[0] if photo_urls else PLACEHOLDER_IMAGE_URL),
+        "photos": photo_urls,
+        "categories": [cat.get("title", "") if isinstance(cat, dict) else str(cat) for cat in get("categories", [])],
+        "is_closed": get("is_closed", False),
+        "review_highlight": _strip_highlights(contextual.get("review_snippet", "")),
+        "website": attributes.get("BusinessUrl", ""),
+    }
+    for field, attr in attr_fields:
+        fields[field] = attributes.get(attr, False)
+    return fields
+
+
 # Pydantic models for tool parameters
-class RestaurantSearchParams(BaseModel):
-    location: str
-    food_type: Optional[str] = None
+class _SearchParams(BaseModel):
+    """Frozen, so validated search params are hashable and usable directly as cache keys"""
+    model_config = ConfigDict(frozen=True)
+
 
+class RestaurantSearchParams(_SearchParams):
+    location: str = Field(min_length=1)
+    food_type: Optional[str] = ""
+    num_guests: Optional[int] = 1
+    max_price_per_person: Optional[float] = None
+    min_rating: Optional[float] = None
 
-class ActivitySearchParams(BaseModel):
-    location: str
 
+class ActivitySearchParams(_SearchParams):
+    location: str = Field(min_length=1)
+    activity_type: Optional[str] = ""
+    num_guests: Optional[int] = 1
+    max_price_per_person: Optional[float] = None
+    min_rating: Optional[float] = None
 
-class HotelSearchParams(BaseModel):
-    location: str
+
+class HotelSearchParams(_SearchParams):
+    location: str = Field(min_length=1)
     budget_sol: Optional[float] = 0.0
+    num_guests: Optional[int] = 1
+    num_rooms: Optional[int] = 1
+    nights: Optional[int] = 1
+    max_price_per_night: Optional[float] = None
+    min_rating: Optional[float] = None
+
+
+class UpdateMapParams(BaseModel):
+    waypoints: Optional[list[Union[str, dict]]] = None  # Location names or {location, coordinates}
+    route_description: Optional[str] = ""
+    route_type: str = "driving"  # driving, walking, cycling, transit (unknown types route as driving)
+
+
+class BatchToolCall(BaseModel):
+    tool: str  # Tool name, e.g. "search_restaurants"
+    params: dict = {}
+
+
+def _get_http_session() -> aiohttp.ClientSession:
+    """Shared aiohttp session for Mapbox calls, so requests reuse pooled keep-alive
+    connections instead of a new TCP + TLS handshake each. Created on startup; created
+    lazily here when the handlers are called outside the app (e.g. from tests).
+    """
+    session = getattr(app.state, "http_session", None)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=64,  # Nearly every call goes to api.mapbox.com
+                ttl_dns_cache=300,
+                keepalive_timeout=75,
+            ),
+            timeout=MAPBOX_TIMEOUT,
+        )
+        app.state.http_session = session
+    return session
+
+
+def _get_mapbox_semaphore() -> asyncio.Semaphore:
+    """Limiter for MAPBOX_MAX_CONCURRENCY. Created on startup (or lazily here) rather than
+    at import, since on Python 3.9 an asyncio primitive binds to the loop current when
+    it is built, which may not be the one serving requests.
+    """
+    semaphore = getattr(app.state, "mapbox_semaphore", None)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(MAPBOX_MAX_CONCURRENCY)
+        app.state.mapbox_semaphore = semaphore
+    return semaphore
+
+
+@asynccontextmanager
+async def _mapbox_request(session: aiohttp.ClientSession, method: str, url, **kwargs):
+    """
+    Send a Mapbox request with at most MAPBOX_MAX_CONCURRENCY in flight, yielding the
+    response. 429s are retried up to MAPBOX_MAX_RETRIES times, waiting for Retry-After
+    (capped at MAPBOX_MAX_BACKOFF) or else 0.5s, 1s, 2s...; the slot is released while waiting.
+    """
+    for attempt in itertools.count():
+        async with _get_mapbox_semaphore():
+            async with session.request(method, url, **kwargs) as response:
+                if response.status != 429 or attempt >= MAPBOX_MAX_RETRIES:
+                    yield response
+                    return
+                retry_after = response.headers.get("Retry-After", "")
+        delay = float(retry_after) if retry_after.isdigit() else 0.5 * 2 ** attempt
+        delay = min(delay, MAPBOX_MAX_BACKOFF)
+        log.warning("⚠️ [MAPBOX API] Rate limited, retrying in %.1fs (attempt %d/%d)", delay, attempt + 1, MAPBOX_MAX_RETRIES)
+        await asyncio.sleep(delay)
+
+
+def _get_yelp_client() -> httpx.AsyncClient:
+    """Shared httpx client for Yelp v3 calls. Uses HTTP/2 (one multiplexed connection
+    for concurrent searches) when the h2 package is installed, HTTP/1.1 keep-alive otherwise.
+    """
+    client = getattr(app.state, "yelp_client", None)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=15.0,
+        )
+        app.state.yelp_client = client
+    return client
 
 
 # Startup event to initialize vendor wallet
 @app.on_event("startup")
 async def startup_event():
-    """Initialize vendor wallet on server startup."""
+    """Initialize vendor wallet and the shared HTTP clients on server startup."""
+    _get_http_session()
+    _get_yelp_client()
+    _get_mapbox_semaphore()
+    _get_yelp_semaphore()
+    await _warm_geocode_cache()
     public_key, is_new = initialize_vendor_wallet()
     if is_new:
-        print("WARNING: New vendor wallet generated. Save the secret key to .env!")
+        log.warning("WARNING: New vendor wallet generated. Save the secret key to .env!")
     else:
-        print(f"Vendor wallet loaded: {public_key}")
+        log.info("Vendor wallet loaded: %s", public_key)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the shared HTTP clients."""
+    session = getattr(app.state, "http_session", None)
+    if session is not None:
+        await session.close()
+    # Bound to this loop; a later startup (e.g. another TestClient) builds a fresh one
+    app.state.mapbox_semaphore = None
+    app.state.yelp_semaphore = None
+    client = getattr(app.state, "yelp_client", None)
+    if client is not None:
+        await client.aclose()
+    if _geocode_disk is not None:
+        _geocode_disk.close()
+    if _route_disk is not None:
+        _route_disk.close()
+
+
+# Cache for geocoded locations to avoid repeated API calls (bounded, least recently used evicted)
+GEOCODE_CACHE_SIZE = 10_000
+_geocode_cache: LRUCache = LRUCache(maxsize=GEOCODE_CACHE_SIZE)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def _normalize_location(location: str) -> str:
+    """Canonical cache key for a location: NFKC, lowercase, single spaces, no trailing
+    punctuation ("  Paris, " / "paris" / "Ｐａｒｉｓ" all map to "paris"). Memoized, so a
+    repeat lookup of the same raw string skips the NFKC pass and regex entirely.
+    """
+    location = unicodedata.normalize("NFKC", location).lower()
+    return _WHITESPACE_RE.sub(" ", location).strip().rstrip(".,;:!?").rstrip()
+
+# Optional: persist geocodes across restarts with diskcache (pip install diskcache)
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+GEOCODE_CACHE_DIR = os.getenv(
+    "GEOCODE_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "geocode")
+)
+GEOCODE_CACHE_TTL = 30 * 86400  # seconds
+GEOCODE_WARM_SIZE = 1000  # entries loaded into memory at startup
+_geocode_disk = diskcache.Cache(GEOCODE_CACHE_DIR) if DISKCACHE_AVAILABLE else None
+
+
+def _read_warm_geocodes() -> list[tuple[str, tuple[float, float]]]:
+    """Up to GEOCODE_WARM_SIZE persisted (location, coords) pairs (blocking SQLite reads)"""
+    entries = []
+    for key in itertools.islice(_geocode_disk.iterkeys(), GEOCODE_WARM_SIZE):
+        coords = _geocode_disk.get(key)
+        if coords is not None:
+            entries.append((key, coords))
+    return entries
+
+
+def _disk_set(disk, key, value, expire: float):
+    """Blocking diskcache write, run on an executor thread; a failed write only loses persistence"""
+    try:
+        disk.set(key, value, expire=expire)
+    except Exception as e:
+        log.warning("⚠️ [DISK CACHE] Write failed: %s", e)
+
+
+async def _warm_geocode_cache():
+    """Preload persisted geocodes into the in-memory cache"""
+    if _geocode_disk is None:
+        return
+    # diskcache is SQLite underneath: read on an executor thread, not the event loop
+    entries = await asyncio.get_running_loop().run_in_executor(None, _read_warm_geocodes)
+    for key, coords in entries:
+        _geocode_cache[key] = coords
+    log.info("📍 [GEOCODE] Warmed %d cached locations from disk", len(_geocode_cache))
+
+# Straight-line fallback path: steps per waypoint-to-waypoint segment (5 intermediate points)
+FALLBACK_SEGMENT_STEPS = 6
+# Interpolation fractions 0, 1/6, ..., 5/6, shaped to broadcast over (segments, steps, lat/lng)
+_FALLBACK_T = (np.arange(FALLBACK_SEGMENT_STEPS, dtype=np.float64) / FALLBACK_SEGMENT_STEPS).reshape(1, -1, 1)
 
+# Max concurrent geocoding requests issued by a single update_map call
+GEOCODE_CONCURRENCY = 8
 
-# Cache for geocoded locations to avoid repeated API calls
-_geocode_cache: dict[str, tuple[float, float]] = {}
+# Queries per Mapbox batch geocoding request
+GEOCODE_BATCH_SIZE = 50
+
+# Default location when a place can't be resolved
+DEFAULT_COORDS = (37.7749, -122.4194)  # San Francisco
+
+# Well-known places resolved locally without a Mapbox round trip (keys are normalized
+# names, matched exactly; anything else goes to Mapbox)
+CITY_COORDS: dict[str, tuple[float, float]] = {
+    "san francisco": (37.7749, -122.4194),
+    "sf": (37.7749, -122.4194),
+    "oakland": (37.8044, -122.2712),
+    "berkeley": (37.8715, -122.2730),
+    "alameda": (37.7652, -122.2416),
+    "sausalito": (37.8591, -122.4853),
+    "daly city": (37.6879, -122.4702),
+    "san mateo": (37.5630, -122.3255),
+    "palo alto": (37.4419, -122.1430),
+    "mountain view": (37.3861, -122.0839),
+    "sunnyvale": (37.3688, -122.0363),
+    "san jose": (37.3382, -121.8863),
+    "napa": (38.2975, -122.2869),
+    "sonoma": (38.2919, -122.4580),
+    "santa cruz": (36.9741, -122.0308),
+}
+
+
+async def _cached_location(location_lower: str) -> Optional[tuple[float, float]]:
+    """Resolve a normalized location without the network: known places, then memory, then
+    disk (read on an executor thread, so SQLite I/O never blocks the event loop)"""
+    # Exact names only: a word match would send "San Jose, Costa Rica" or "Berkeley
+    # Springs, WV" to the Bay Area without ever asking Mapbox
+    coords = CITY_COORDS.get(location_lower)
+    if coords:
+        return coords
+    coords = _geocode_cache.get(location_lower)
+    if coords is not None:
+        return coords
+    if _geocode_disk is not None:
+        coords = await asyncio.get_running_loop().run_in_executor(None, _geocode_disk.get, location_lower)
+        if coords is not None:
+            _geocode_cache[location_lower] = coords
+            return coords
+    return None
+
+
+def _remember_location(location_lower: str, coords: tuple[float, float]):
+    """Store a fresh geocode in the memory cache and, if enabled, write it back to the disk
+    cache in the background"""
+    _geocode_cache[location_lower] = coords
+    if _geocode_disk is not None:
+        asyncio.get_running_loop().run_in_executor(
+            None, _disk_set, _geocode_disk, location_lower, coords, GEOCODE_CACHE_TTL
+        )
+
+
+# Invariant geocoding query params; the access token is added per call
+_GEOCODE_PARAMS_BASE = {
+    "limit": 1,  # Only need the top result
+    "types": "place,locality,neighborhood,address,poi"  # Prioritize places
+}
+
+
+@lru_cache(maxsize=4096)
+def _geocode_url(location: str) -> yarl.URL:
+    """Geocoding URL for a raw location string. yarl percent-encodes the path segment and
+    aiohttp accepts the URL object directly; memoized so repeat places skip the encoding.
+    """
+    return MAPBOX_GEOCODING_URL / f"{location}.json"
+
+
+# Geocode requests in flight, by normalized location
+_geocode_inflight: dict[str, asyncio.Task] = {}
+
+
+def _retire_inflight(inflight: dict, key, task: asyncio.Task):
+    """Done callback dropping a finished request from its in-flight map"""
+    del inflight[key]
 
 
 async def get_location_coordinates(location: str) -> tuple[float, float]:
@@ -102,170 +579,369 @@ async def get_location_coordinates(location: str) -> tuple[float, float]:
     Get lat/lng coordinates for a location using Mapbox Geocoding API.
     Works with ANY location worldwide!
     """
-    location_lower = location.lower().strip()
+    location_lower = _normalize_location(location)
     
-    # Check cache first
-    if location_lower in _geocode_cache:
-        coords = _geocode_cache[location_lower]
-        print(f"📍 [GEOCODE] Cache hit: '{location}' -> {coords}")
+    coords = await _cached_location(location_lower)
+    if coords:
         return coords
     
     # Use Mapbox Geocoding API
     if not MAPBOX_ACCESS_TOKEN:
-        print(f"⚠️ [GEOCODE] No Mapbox token - cannot geocode '{location}'")
-        return (37.7749, -122.4194)  # Default to SF
+        log.warning("⚠️ [GEOCODE] No Mapbox token - cannot geocode %r", location)
+        return DEFAULT_COORDS
     
+    # Concurrent misses for the same place share one Mapbox call; shield it so one
+    # caller being cancelled doesn't cancel it for the others
+    task = _geocode_inflight.get(location_lower)
+    if task is None:
+        task = asyncio.ensure_future(_request_geocode(location, location_lower))
+        _geocode_inflight[location_lower] = task
+        task.add_done_callback(partial(_retire_inflight, _geocode_inflight, location_lower))
+    return await asyncio.shield(task)
+
+
+async def _request_geocode(location: str, location_lower: str) -> tuple[float, float]:
+    """One Mapbox geocoding request for get_location_coordinates"""
     try:
-        # URL encode the location
-        import urllib.parse
-        encoded_location = urllib.parse.quote(location)
-        
-        url = f"{MAPBOX_GEOCODING_API}/{encoded_location}.json"
-        params = {
-            "access_token": MAPBOX_ACCESS_TOKEN,
-            "limit": 1,  # Only need the top result
-            "types": "place,locality,neighborhood,address,poi"  # Prioritize places
-        }
+        url = _geocode_url(location)
+        params = {**_GEOCODE_PARAMS_BASE, "access_token": MAPBOX_ACCESS_TOKEN}
         
-        print(f"🔍 [GEOCODE] Looking up: '{location}'...")
+        log.debug("🔍 [GEOCODE] Looking up: %r...", location)
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
+        async with _mapbox_request(_get_http_session(), "GET", url, params=params) as response:
+            if response.status == 200:
+                # Raw bytes into orjson, skipping aiohttp's str decode + stdlib json
+                data = orjson.loads(await response.read())
+                
+                if data.get("features") and len(data["features"]) > 0:
+                    feature = data["features"][0]
+                    # Mapbox returns [longitude, latitude]
+                    lng, lat = feature["geometry"]["coordinates"]
+                    place_name = feature.get("place_name", location)
                     
-                    if data.get("features") and len(data["features"]) > 0:
-                        feature = data["features"][0]
-                        # Mapbox returns [longitude, latitude]
-                        lng, lat = feature["geometry"]["coordinates"]
-                        place_name = feature.get("place_name", location)
-                        
-                        coords = (lat, lng)
-                        _geocode_cache[location_lower] = coords
-                        
-                        print(f"✅ [GEOCODE] Found: '{location}' -> '{place_name}' -> ({lat}, {lng})")
-                        return coords
-                    else:
-                        print(f"⚠️ [GEOCODE] No results for '{location}'")
-                else:
-                    error_text = await response.text()
-                    print(f"❌ [GEOCODE] API error {response.status}: {error_text[:200]}")
+                    coords = (lat, lng)
+                    _remember_location(location_lower, coords)
                     
+                    log.debug("✅ [GEOCODE] Found: %r -> %r -> (%s, %s)", location, place_name, lat, lng)
+                    return coords
+                else:
+                    log.warning("⚠️ [GEOCODE] No results for %r", location)
+            else:
+                error_text = (await response.read())[:200].decode("utf-8", "replace")
+                log.error("❌ [GEOCODE] API error %s: %s", response.status, error_text)
+                
+    except asyncio.TimeoutError:
+        log.error("❌ [GEOCODE] Timed out geocoding %r", location)
+    except orjson.JSONDecodeError as e:
+        log.error("❌ [GEOCODE] Invalid JSON geocoding %r: %s", location, e)
     except Exception as e:
-        print(f"❌ [GEOCODE] Error geocoding '{location}': {e}")
+        log.error("❌ [GEOCODE] Error geocoding %r: %s", location, e)
     
     # Fallback to San Francisco if geocoding fails
-    print(f"⚠️ [GEOCODE] Using San Francisco as fallback for '{location}'")
-    return (37.7749, -122.4194)
+    log.warning("⚠️ [GEOCODE] Using San Francisco as fallback for %r", location)
+    return DEFAULT_COORDS
 
 
-async def get_route_from_mapbox(waypoint_coords: list, route_type: str = "driving") -> Optional[dict]:
+async def _batch_geocode_request(locations: list[str]) -> Optional[list[Optional[tuple[float, float]]]]:
+    """One Mapbox v6 batch geocoding call; None if the request itself failed, and a None
+    entry for each query it found nothing for"""
+    body = [
+        {"q": location, "limit": 1, "types": ["place", "locality", "neighborhood", "address"]}
+        for location in locations
+    ]
+    try:
+        async with _mapbox_request(
+            _get_http_session(),
+            "POST",
+            MAPBOX_BATCH_GEOCODING_URL,
+            params={"access_token": MAPBOX_ACCESS_TOKEN},
+            data=orjson.dumps(body),
+            headers={"Content-Type": "application/json"},
+        ) as response:
+            if response.status != 200:
+                error_text = (await response.read())[:200].decode("utf-8", "replace")
+                log.error("❌ [GEOCODE] Batch API error %s: %s", response.status, error_text)
+                return None
+            data = orjson.loads(await response.read())
+    except asyncio.TimeoutError:
+        log.error("❌ [GEOCODE] Timed out batch geocoding %d locations", len(locations))
+        return None
+    except Exception as e:
+        log.error("❌ [GEOCODE] Batch geocoding error: %s", e)
+        return None
+    
+    results = []
+    for collection in data.get("batch", []):
+        features = collection.get("features")
+        if features:
+            # Mapbox returns [longitude, latitude]
+            lng, lat = features[0]["geometry"]["coordinates"]
+            results.append((lat, lng))
+        else:
+            results.append(None)
+    if len(results) != len(locations):
+        log.error("❌ [GEOCODE] Batch returned %d results for %d locations", len(results), len(locations))
+        return None
+    return results
+
+
+async def batch_geocode(locations: list[str]) -> list[tuple[float, float]]:
+    """
+    Geocode several locations at once, in input order.
+    Cached and well-known places resolve locally; the rest go to Mapbox in batch
+    requests of up to GEOCODE_BATCH_SIZE queries. v6 has no POI index, so a query the
+    batch can't resolve (landmarks like "Golden Gate Bridge") is geocoded on its own
+    through get_location_coordinates, as are all locations of a failed batch call
+    (e.g. the token lacks batch access).
+    """
+    keys = [_normalize_location(location) for location in locations]
+    resolved: dict[str, tuple[float, float]] = {}
+    misses: dict[str, str] = {}
+    for key, location in zip(keys, locations):
+        coords = await _cached_location(key)
+        if coords:
+            resolved[key] = coords
+        else:
+            misses.setdefault(key, location)
+    
+    if misses and MAPBOX_ACCESS_TOKEN:
+        miss_keys = list(misses)
+        chunks = [miss_keys[i:i + GEOCODE_BATCH_SIZE] for i in range(0, len(miss_keys), GEOCODE_BATCH_SIZE)]
+        log.debug("🔍 [GEOCODE] Batch looking up %d locations in %d request(s)...", len(miss_keys), len(chunks))
+        batches = await asyncio.gather(*[
+            _batch_geocode_request([misses[key] for key in chunk]) for chunk in chunks
+        ])
+        failed = []
+        for chunk, results in zip(chunks, batches):
+            if results is None:
+                failed.extend(chunk)
+                continue
+            for key, coords in zip(chunk, results):
+                if coords:
+                    _remember_location(key, coords)
+                    resolved[key] = coords
+                else:
+                    failed.append(key)
+        
+        if failed:
+            limiter = asyncio.Semaphore(GEOCODE_CONCURRENCY)
+            
+            async def geocode_limited(name: str) -> tuple[float, float]:
+                async with limiter:
+                    return await get_location_coordinates(name)
+            
+            resolved.update(zip(failed, await asyncio.gather(*[
+                geocode_limited(misses[key]) for key in failed
+            ])))
+    
+    for key in misses:
+        if key not in resolved:
+            log.warning("⚠️ [GEOCODE] Using San Francisco as fallback for %r", misses[key])
+    return [resolved.get(key, DEFAULT_COORDS) for key in keys]
+
+
+# Valid coordinate ranges, used to drop bad points from decoded Directions geometries
+LNG_MIN, LNG_MAX = -180.0, 180.0
+LAT_MIN, LAT_MAX = -90.0, 90.0
+
+
+def _decode_polyline6(encoded: str) -> np.ndarray:
+    """
+    Decode a Mapbox polyline6 string into an (N, 2) float64 [lat, lng] array, vectorized:
+    each value is a run of 5-bit chunks (chars - 63, continuation bit 0x20), zigzag-encoded
+    as a delta from the previous point.
+    """
+    chunks = np.frombuffer(encoded.encode("ascii"), dtype=np.uint8).astype(np.int64) - 63
+    ends = np.flatnonzero(chunks < 0x20)  # Last chunk of each value
+    if not len(ends) or ends[-1] != len(chunks) - 1 or len(ends) % 2:
+        raise ValueError("truncated polyline")
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    # Position of every chunk within its value -> its bit shift
+    shifts = 5 * (np.arange(len(chunks)) - np.repeat(starts, ends - starts + 1))
+    values = np.add.reduceat((chunks & 0x1F) << shifts, starts)
+    deltas = np.where(values & 1, ~(values >> 1), values >> 1)
+    return np.cumsum(deltas.reshape(-1, 2), axis=0) / 1e6
+
+
+def _in_range(path: np.ndarray) -> np.ndarray:
+    """Rows of an (N, 2) [lat, lng] array that are valid coordinates (NaNs fail too)"""
+    lat = path[:, 0]
+    lng = path[:, 1]
+    return path[(lat >= LAT_MIN) & (lat <= LAT_MAX) & (lng >= LNG_MIN) & (lng <= LNG_MAX)]
+
+
+# Directions results keyed on (profile, waypoints rounded to ~11 m), so repeated or
+# slightly drifted itineraries skip the API
+ROUTE_CACHE_SIZE = 1024
+ROUTE_CACHE_TTL = 3600  # seconds
+ROUTE_CACHE_PRECISION = 4  # decimal places
+_route_cache: TTLCache = TTLCache(maxsize=ROUTE_CACHE_SIZE, ttl=ROUTE_CACHE_TTL)
+_route_inflight: dict[tuple, asyncio.Task] = {}
+
+# Routes also persist across restarts with diskcache (if installed), stored compactly as
+# (polyline6 geometry, distance, duration) and decoded again on load
+ROUTE_CACHE_DIR = os.getenv(
+    "ROUTE_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "routes")
+)
+ROUTE_DISK_TTL = 86400  # seconds
+_route_disk = diskcache.Cache(ROUTE_CACHE_DIR) if DISKCACHE_AVAILABLE else None
+
+
+def _route_result(path_array: np.ndarray, distance: float, duration: float, geometry) -> dict:
+    """The route dict get_route_from_mapbox returns, for a validated (N, 2) [lat, lng] path"""
+    return {
+        "path": path_array.tolist(),
+        "path_array": path_array,  # Same points as an (N, 2) array, for bounds
+        "distance": distance,  # in meters
+        "duration": duration,  # in seconds
+        "geometry": geometry  # Keep original format (polyline6 string) for reference
+    }
+
+
+async def get_route_from_mapbox(
+    waypoint_coords: list,
+    route_type: str = "driving",
+    session: Optional[aiohttp.ClientSession] = None,
+) -> Optional[dict]:
     """
     Get route from Mapbox Directions API
     
     Args:
         waypoint_coords: List of [lat, lng] coordinate pairs
         route_type: Route profile - 'driving', 'walking', 'cycling', or 'driving-traffic'
+        session: aiohttp session to send the request on (default: the shared app session)
     
     Returns:
         Dictionary with path coordinates and route information, or None if API call fails
+        or the waypoints are all one place. Routes are cached and shared between callers,
+        so treat the result as read-only.
     """
     if not MAPBOX_ACCESS_TOKEN:
-        print("⚠️ Mapbox Directions API: No access token found. Set MAPBOX_ACCESS_TOKEN or NEXT_PUBLIC_MAPBOX_TOKEN in environment.")
+        log.warning("⚠️ Mapbox Directions API: No access token found. Set MAPBOX_ACCESS_TOKEN or NEXT_PUBLIC_MAPBOX_TOKEN in environment.")
         return None
     
-    if len(waypoint_coords) < 2:
+    # Adjacent waypoints in the same cache cell (an agent repeating "San Francisco") add
+    # nothing to the route: drop them, and skip the API if only one place is left
+    cells = [(round(coord[0], ROUTE_CACHE_PRECISION), round(coord[1], ROUTE_CACHE_PRECISION)) for coord in waypoint_coords]
+    keep = [i for i, cell in enumerate(cells) if i == 0 or cell != cells[i - 1]]
+    if len(keep) < 2:
+        return None
+    if len(keep) < len(cells):
+        waypoint_coords = [waypoint_coords[i] for i in keep]
+    if len(waypoint_coords) > MAPBOX_MAX_COORDINATES:
+        log.warning("⚠️ [MAPBOX API] %d waypoints exceeds the %d-coordinate limit, skipping", len(waypoint_coords), MAPBOX_MAX_COORDINATES)
         return None
     
-    # Map route_type to Mapbox profile (must include "mapbox/" prefix)
-    profile_map = {
-        "driving": "mapbox/driving",
-        "walking": "mapbox/walking",
-        "cycling": "mapbox/cycling",
-        "transit": "mapbox/driving"  # Mapbox doesn't have transit, use driving
-    }
-    profile = profile_map.get(route_type, "mapbox/driving")
+    profile = PROFILE_MAP.get(route_type, DEFAULT_PROFILE)
+    key = (profile, tuple(cells[i] for i in keep))
+    route = _route_cache.get(key)
+    if route is not None:
+        return route
+    if _route_disk is not None:
+        # SQLite read on an executor thread so it never blocks the event loop
+        stored = await asyncio.get_running_loop().run_in_executor(None, _route_disk.get, key)
+        if stored is not None:
+            geometry, distance, duration = stored
+            route = _route_result(_in_range(_decode_polyline6(geometry)), distance, duration, geometry)
+            _route_cache[key] = route
+            return route
     
+    # Concurrent requests for the same route share one Mapbox call; shield it so one
+    # caller being cancelled doesn't cancel it for the others
+    task = _route_inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_request_route(waypoint_coords, profile, session))
+        _route_inflight[key] = task
+        task.add_done_callback(partial(_route_request_done, key))
+    return await asyncio.shield(task)
+
+
+def _route_request_done(key: tuple, task: asyncio.Task):
+    """Retire an in-flight route request, caching its route if it produced one"""
+    del _route_inflight[key]
+    if not task.cancelled() and task.exception() is None and task.result() is not None:
+        route = task.result()
+        _route_cache[key] = route
+        if _route_disk is not None and isinstance(route["geometry"], str):
+            # Written back in the background (see _disk_set)
+            asyncio.get_running_loop().run_in_executor(
+                None, _disk_set, _route_disk, key, (route["geometry"], route["distance"], route["duration"]), ROUTE_DISK_TTL
+            )
+
+
+async def _request_route(waypoint_coords: list, profile: str, session: Optional[aiohttp.ClientSession]) -> Optional[dict]:
+    """One Mapbox Directions request for get_route_from_mapbox"""
     # Convert coordinates from [lat, lng] to [lng, lat] format for Mapbox API
-    # Mapbox expects: {lng},{lat};{lng},{lat} (semicolon-separated)
-    coordinates_str = ";".join([f"{coord[1]},{coord[0]}" for coord in waypoint_coords])
+    # Mapbox expects: {lng},{lat};{lng},{lat} (semicolon-separated). 6 decimal places
+    # (~0.1 m) is Mapbox's own precision and keeps URLs short for float-noisy inputs
+    coordinates_str = ";".join(["%.6f,%.6f" % (coord[1], coord[0]) for coord in waypoint_coords])
     
     # Build API URL according to: https://api.mapbox.com/directions/v5/{profile}/{coordinates}
     url = f"{MAPBOX_DIRECTIONS_API}/{profile}/{coordinates_str}"
-    params = {
-        "geometries": "geojson",
-        "access_token": MAPBOX_ACCESS_TOKEN,
-        "overview": "full"  # Get full geometry for detailed route
-    }
+    params = {**_ROUTE_PARAMS_BASE, "access_token": MAPBOX_ACCESS_TOKEN}
     
-    print(f"🗺️ [MAPBOX API] Requesting route: {profile}")
-    print(f"   URL: {url.split('?')[0]}")  # Don't log token
-    print(f"   Waypoints: {len(waypoint_coords)} coordinates")
+    # The token travels in params, so the logged URL never contains it
+    log.debug("🗺️ [MAPBOX API] Requesting route: %s\n   URL: %s\n   Waypoints: %d coordinates", profile, url, len(waypoint_coords))
     
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                response_text = await response.text()
+        async with _mapbox_request(session or _get_http_session(), "GET", url, params=params) as response:
+            # Raw bytes straight into orjson: no str decode, fast float parsing for long geometries
+            body = await response.read()
+            
+            if response.status == 200:
+                try:
+                    data = orjson.loads(body)
+                except orjson.JSONDecodeError:
+                    log.error("❌ [MAPBOX API] Invalid JSON response: %s", body[:200].decode(errors="replace"))
+                    return None
                 
-                if response.status == 200:
+                # Check for API error codes in response
+                if data.get("code") and data.get("code") != "Ok":
+                    log.error("❌ [MAPBOX API] Error code: %s - %s", data.get("code"), data.get("message", "Unknown error"))
+                    return None
+                
+                if data.get("routes") and len(data["routes"]) > 0:
+                    route = data["routes"][0]
+                    geometry = route.get("geometry")
+                    
+                    # polyline6 (requested in _ROUTE_PARAMS_BASE) decodes straight to [lat, lng],
+                    # the frontend's order
                     try:
-                        data = json.loads(response_text)
-                    except json.JSONDecodeError:
-                        print(f"❌ [MAPBOX API] Invalid JSON response: {response_text[:200]}")
+                        if not isinstance(geometry, str):
+                            raise ValueError(f"expected a polyline6 string, got {type(geometry).__name__}")
+                        path_array = _in_range(_decode_polyline6(geometry))
+                    except (ValueError, UnicodeEncodeError) as e:
+                        log.error("❌ [MAPBOX API] Invalid route polyline: %s", e)
                         return None
                     
-                    # Check for API error codes in response
-                    if data.get("code") and data.get("code") != "Ok":
-                        print(f"❌ [MAPBOX API] Error code: {data.get('code')} - {data.get('message', 'Unknown error')}")
+                    if len(path_array) < 2:
+                        log.warning("⚠️ [MAPBOX API] Validated path has insufficient coordinates: %d", len(path_array))
                         return None
                     
-                    if data.get("routes") and len(data["routes"]) > 0:
-                        route = data["routes"][0]
-                        geometry = route.get("geometry", {})
-                        coordinates = geometry.get("coordinates", [])
-                        
-                        if not coordinates or len(coordinates) < 2:
-                            print(f"⚠️ [MAPBOX API] Route has insufficient coordinates: {len(coordinates)}")
-                            return None
-                        
-                        # Convert from [lng, lat] to [lat, lng] for frontend
-                        # Mapbox returns coordinates as [lng, lat] pairs in GeoJSON format
-                        path_coordinates = []
-                        for coord in coordinates:
-                            if isinstance(coord, list) and len(coord) >= 2:
-                                lng = float(coord[0])
-                                lat = float(coord[1])
-                                # Validate coordinates
-                                if -180 <= lng <= 180 and -90 <= lat <= 90:
-                                    path_coordinates.append([lat, lng])
-                        
-                        if len(path_coordinates) < 2:
-                            print(f"⚠️ [MAPBOX API] Validated path has insufficient coordinates: {len(path_coordinates)}")
-                            return None
-                        
-                        print(f"✅ [MAPBOX API] Route calculated: {len(path_coordinates)} points, {route.get('distance', 0)/1000:.1f}km, {route.get('duration', 0)/60:.1f}min")
-                        
-                        return {
-                            "path": path_coordinates,
-                            "distance": route.get("distance", 0),  # in meters
-                            "duration": route.get("duration", 0),  # in seconds
-                            "geometry": coordinates  # Keep original [lng, lat] format for reference
-                        }
-                    else:
-                        print(f"⚠️ [MAPBOX API] No routes found in response")
-                        return None
+                    log.debug("✅ [MAPBOX API] Route calculated: %d points, %.1fkm, %.1fmin", len(path_array), route.get("distance", 0) / 1000, route.get("duration", 0) / 60)
+                    
+                    return _route_result(path_array, route.get("distance", 0), route.get("duration", 0), geometry)
                 else:
-                    try:
-                        error_data = json.loads(response_text)
-                        error_msg = error_data.get("message", response_text)
-                    except:
-                        error_msg = response_text
-                    print(f"❌ [MAPBOX API] HTTP {response.status} error: {error_msg}")
+                    log.warning("⚠️ [MAPBOX API] No routes found in response")
                     return None
+            else:
+                response_text = body.decode(errors="replace")
+                try:
+                    error_data = orjson.loads(body)
+                    error_msg = error_data.get("message", response_text)
+                except:
+                    error_msg = response_text
+                log.error("❌ [MAPBOX API] HTTP %s error: %s", response.status, error_msg)
+                return None
+    except asyncio.TimeoutError:
+        log.error("❌ [MAPBOX API] Request timed out")
+        return None
+    except aiohttp.ClientError as e:
+        # Connection/DNS failures are expected during an outage: summary only, no traceback
+        log.error("❌ [MAPBOX API] Client error: %s", e)
+        return None
     except Exception as e:
-        print(f"❌ [MAPBOX API] Exception calling API: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("❌ [MAPBOX API] Exception calling API: %s", e)
         return None
 
 
@@ -282,14 +958,12 @@ async def call_yelp_business_search_v3(
     This is the standard Yelp API with different rate limits.
     """
     if not YELP_API_KEY:
-        print("⚠️ [YELP V3] No API key configured")
+        log.warning("⚠️ [YELP V3] No API key configured")
         return None
     
-    print(f"🔄 [YELP V3 FALLBACK] Searching: term='{term}', location='{location}'")
+    log.info("🔄 [YELP V3 FALLBACK] Searching: term=%r, location=%r", term, location)
     
     try:
-        import httpx
-        
         params = {
             "term": term,
             "location": location,
@@ -306,70 +980,145 @@ async def call_yelp_business_search_v3(
         if categories:
             params["categories"] = categories
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://api.yelp.com/v3/businesses/search",
-                headers={
-                    "Authorization": f"Bearer {YELP_API_KEY}",
-                    "Accept": "application/json"
-                },
-                params=params,
-                timeout=15.0
-            )
+        response = await _get_yelp_client().get(
+            "https://api.yelp.com/v3/businesses/search",
+            headers={
+                "Authorization": f"Bearer {YELP_API_KEY}",
+                "Accept": "application/json"
+            },
+            params=params,
+            timeout=15.0
+        )
+        
+        if response.status_code == 200:
+            data = orjson.loads(response.content)  # Raw bytes, no str decode
+            businesses = data.get("businesses", [])
+            log.debug("✅ [YELP V3] Found %d businesses", len(businesses))
+            
+            # Transform v3 response to match our expected format
+            transformed_businesses = []
+            for b in businesses:
+                coords = b.get("coordinates", {})
+                transformed_businesses.append({
+                    "id": b.get("id"),
+                    "name": b.get("name"),
+                    "rating": b.get("rating"),
+                    "review_count": b.get("review_count"),
+                    "price": b.get("price", "$$"),
+                    "phone": b.get("phone"),
+                    "address": ", ".join(b.get("location", {}).get("display_address", [])),
+                    "coordinates": [coords.get("latitude"), coords.get("longitude")] if coords else None,
+                    "categories": [c.get("title") for c in b.get("categories", [])],
+                    "image_url": b.get("image_url"),
+                    "yelp_url": b.get("url"),
+                    "is_closed": b.get("is_closed", False)
+                })
+            
+            return {
+                "businesses": transformed_businesses,
+                "total": data.get("total", len(transformed_businesses)),
+                "source": "yelp_v3_fallback"
+            }
+        elif response.status_code == 429:
+            log.error("❌ [YELP V3] Also rate limited (429)")
+            return None
+        else:
+            log.error("❌ [YELP V3] Error %s: %s", response.status_code, response.text[:200])
+            return None
             
-            if response.status_code == 200:
-                data = response.json()
-                businesses = data.get("businesses", [])
-                print(f"✅ [YELP V3] Found {len(businesses)} businesses")
-                
-                # Transform v3 response to match our expected format
-                transformed_businesses = []
-                for b in businesses:
-                    coords = b.get("coordinates", {})
-                    transformed_businesses.append({
-                        "id": b.get("id"),
-                        "name": b.get("name"),
-                        "rating": b.get("rating"),
-                        "review_count": b.get("review_count"),
-                        "price": b.get("price", "$$"),
-                        "phone": b.get("phone"),
-                        "address": ", ".join(b.get("location", {}).get("display_address", [])),
-                        "coordinates": [coords.get("latitude"), coords.get("longitude")] if coords else None,
-                        "categories": [c.get("title") for c in b.get("categories", [])],
-                        "image_url": b.get("image_url"),
-                        "yelp_url": b.get("url"),
-                        "is_closed": b.get("is_closed", False)
-                    })
-                
-                return {
-                    "businesses": transformed_businesses,
-                    "total": data.get("total", len(transformed_businesses)),
-                    "source": "yelp_v3_fallback"
-                }
-            elif response.status_code == 429:
-                print(f"❌ [YELP V3] Also rate limited (429)")
-                return None
-            else:
-                print(f"❌ [YELP V3] Error {response.status_code}: {response.text[:200]}")
-                return None
-                
     except Exception as e:
-        print(f"❌ [YELP V3] Exception: {e}")
+        log.error("❌ [YELP V3] Exception: %s", e)
         return None
 
 
+# Yelp search results keyed on (query, location context rounded to ~110 m, fallback
+# search), so repeat searches for the same place skip Yelp and its rate limits
+YELP_CACHE_SIZE = 2048
+YELP_CACHE_TTL = 3600  # seconds
+YELP_CACHE_PRECISION = 3  # decimal places
+_yelp_cache: TTLCache = TTLCache(maxsize=YELP_CACHE_SIZE, ttl=YELP_CACHE_TTL)
+_yelp_inflight: dict[tuple, asyncio.Task] = {}
+
+
 async def call_yelp_fusion_ai(query: str, lat: float = None, lng: float = None, chat_id: str = None, fallback_term: str = None, fallback_location: str = None, fallback_categories: str = None) -> dict:
     """
     Call Yelp Fusion AI API using the yelp-mcp module for real-time business data.
     Falls back to Yelp Business Search API v3 if Fusion AI returns 429 rate limit.
     Returns structured business data with ratings, reviews, and more.
+    
+    At most YELP_MAX_CONCURRENCY searches run at once; the rest wait for a slot.
+    Results with businesses are cached and shared between callers (as are concurrent
+    identical searches), so treat them as read-only. Only the caller that actually ran
+    the search gets its chat_id; shared copies carry chat_id None. Follow-ups in an
+    existing Yelp chat (chat_id) are never cached.
     """
+    if chat_id is not None:
+        return await _request_yelp(query, lat, lng, chat_id, fallback_term, fallback_location, fallback_categories)
+    
+    key = (
+        query,
+        None if lat is None else round(lat, YELP_CACHE_PRECISION),
+        None if lng is None else round(lng, YELP_CACHE_PRECISION),
+        fallback_term,
+        fallback_location,
+        fallback_categories,
+    )
+    result = _yelp_cache.get(key)
+    if result is not None:
+        return result
+    
+    # Concurrent identical searches share one Yelp call (see get_route_from_mapbox)
+    task = _yelp_inflight.get(key)
+    if task is not None:
+        return _without_chat_id(await asyncio.shield(task))
+    task = asyncio.ensure_future(_request_yelp(query, lat, lng, None, fallback_term, fallback_location, fallback_categories))
+    _yelp_inflight[key] = task
+    task.add_done_callback(partial(_yelp_request_done, key))
+    return await asyncio.shield(task)
+
+
+def _yelp_request_done(key: tuple, task: asyncio.Task):
+    """Retire an in-flight Yelp search, caching its result if it found businesses"""
+    del _yelp_inflight[key]
+    if not task.cancelled() and task.exception() is None and task.result() and task.result().get("businesses"):
+        _yelp_cache[key] = _without_chat_id(task.result())
+
+
+def _without_chat_id(result: Optional[dict]) -> Optional[dict]:
+    """Copy of a Yelp result that is safe to hand to other callers: the chat it opened
+    belongs to the caller that ran the search"""
+    if not result or result.get("chat_id") is None:
+        return result
+    shared = {**result, "chat_id": None}
+    raw = result.get("raw_response")
+    if isinstance(raw, dict) and "chat_id" in raw:
+        shared["raw_response"] = {**raw, "chat_id": None}
+    return shared
+
+
+def _get_yelp_semaphore() -> asyncio.Semaphore:
+    """Limiter for YELP_MAX_CONCURRENCY, built on startup or first use (see _get_mapbox_semaphore)"""
+    semaphore = getattr(app.state, "yelp_semaphore", None)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(YELP_MAX_CONCURRENCY)
+        app.state.yelp_semaphore = semaphore
+    return semaphore
+
+
+async def _request_yelp(*args) -> Optional[dict]:
+    """One uncached Yelp search, waiting for a YELP_MAX_CONCURRENCY slot"""
+    async with _get_yelp_semaphore():
+        return await _call_yelp_fusion_ai(*args)
+
+
+async def _call_yelp_fusion_ai(query: str, lat: Optional[float], lng: Optional[float], chat_id: Optional[str], fallback_term: Optional[str], fallback_location: Optional[str], fallback_categories: Optional[str]) -> Optional[dict]:
+    """One uncached Yelp search for call_yelp_fusion_ai"""
     if not YELP_API_KEY:
-        print("⚠️ [YELP] No API key configured")
+        log.warning("⚠️ [YELP] No API key configured")
         return None
     
     if not YELP_MCP_AVAILABLE:
-        print("⚠️ [YELP] Yelp MCP module not available, trying v3 fallback...")
+        log.warning("⚠️ [YELP] Yelp MCP module not available, trying v3 fallback...")
         if fallback_term and fallback_location:
             return await call_yelp_business_search_v3(
                 term=fallback_term,
@@ -380,9 +1129,7 @@ async def call_yelp_fusion_ai(query: str, lat: float = None, lng: float = None,
             )
         return None
     
-    print(f"🔍 [YELP MCP] Querying: '{query}'")
-    if lat and lng:
-        print(f"   📍 Location context: ({lat}, {lng})")
+    log.debug("🔍 [YELP MCP] Querying: %r\n   📍 Location context: (%s, %s)", query, lat, lng)
     
     try:
         # Build user context for location-specific searches
@@ -399,7 +1146,7 @@ async def call_yelp_fusion_ai(query: str, lat: float = None, lng: float = None,
         
         if not response:
             # Fusion AI failed - try v3 fallback
-            print("⚠️ [YELP MCP] No response, trying v3 fallback...")
+            log.warning("⚠️ [YELP MCP] No response, trying v3 fallback...")
             if fallback_term and fallback_location:
                 return await call_yelp_business_search_v3(
                     term=fallback_term,
@@ -421,11 +1168,11 @@ async def call_yelp_fusion_ai(query: str, lat: float = None, lng: float = None,
             if "businesses" in entity:
                 businesses.extend(entity["businesses"])
         
-        print(f"✅ [YELP MCP] Found {len(businesses)} businesses")
+        log.debug("✅ [YELP MCP] Found %d businesses", len(businesses))
         
         # Also get formatted output for logging
         formatted = format_fusion_ai_response(response)
-        print(f"📋 [YELP MCP] Response preview: {formatted[:200]}...")
+        log.debug("📋 [YELP MCP] Response preview: %s...", formatted[:200])
         
         return {
             "chat_id": result_chat_id,
@@ -438,11 +1185,10 @@ async def call_yelp_fusion_ai(query: str, lat: float = None, lng: float = None,
         
     except Exception as e:
         error_str = str(e).lower()
-        print(f"❌ [YELP MCP] Error: {e}")
         
-        # Check if it's a rate limit error (429)
-        if "429" in str(e) or "rate" in error_str or "limit" in error_str or "access_limit" in error_str:
-            print("🔄 [YELP] Rate limited on Fusion AI, trying v3 fallback...")
+        # Check if it's a rate limit error (429): expected under load, so no traceback
+        if "429" in error_str or "rate" in error_str or "limit" in error_str:
+            log.warning("🔄 [YELP] Rate limited on Fusion AI (%s), trying v3 fallback...", e)
             if fallback_term and fallback_location:
                 return await call_yelp_business_search_v3(
                     term=fallback_term,
@@ -451,122 +1197,121 @@ async def call_yelp_fusion_ai(query: str, lat: float = None, lng: float = None,
                     lng=lng,
                     categories=fallback_categories
                 )
+            return None
         
-        import traceback
-        traceback.print_exc()
+        log.exception("❌ [YELP MCP] Error: %s", e)
         return None
 
 
-@app.post("/tools/search_restaurants")
-async def search_restaurants(params: dict) -> dict:
+async def _locate_and_search(location: str, query: str, **fallback) -> tuple[tuple[float, float], Optional[dict]]:
+    """
+    Geocode a tool's location and run its Yelp search with the coordinates as user
+    context. Cached locations resolve without a network call, so only a geocode cache
+    miss adds a round trip. The result is None without a Yelp key.
+    
+    Args:
+        location: Location to search, also the v3 fallback location
+        query: Natural language query for Yelp Fusion AI
+        fallback: fallback_term / fallback_categories for call_yelp_fusion_ai
+    """
+    lat, lng = await get_location_coordinates(location)
+    if not YELP_API_KEY:
+        return (lat, lng), None
+    return (lat, lng), await call_yelp_fusion_ai(query=query, lat=lat, lng=lng, fallback_location=location, **fallback)
+
+
+# Tool results are reused for identical requests within this window
+TOOL_CACHE_SIZE = 1024
+TOOL_CACHE_TTL = 300  # seconds
+
+
+def _cached_tool(key=None, should_cache=lambda result: "error" not in result):
+    """
+    Memoize an async tool endpoint in a per-tool TTLCache.
+    
+    A result's Yelp chat_id belongs to the caller whose search opened that chat, so it
+    is cleared in the cached copy: cache hits come back with chat_id None.
+    
+    Args:
+        key: Maps the params model to a cache key (default: the frozen params model itself)
+        should_cache: Only results it accepts are stored, so failures and degraded
+            fallbacks are retried on the next call instead of being pinned for the TTL
+    """
+    def decorator(func):
+        cache = TTLCache(maxsize=TOOL_CACHE_SIZE, ttl=TOOL_CACHE_TTL)
+        
+        @wraps(func)
+        async def wrapper(params):
+            cache_key = key(params) if key else params
+            result = cache.get(cache_key)
+            if result is None:
+                result = await func(params)
+                if should_cache(result):
+                    cache[cache_key] = {**result, "chat_id": None} if result.get("chat_id") is not None else result
+            return result
+        
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+@_tool_route("/tools/search_restaurants")
+@_cached_tool()
+async def search_restaurants(params: RestaurantSearchParams) -> dict:
     """
     Search for restaurants in a location using Yelp Fusion AI MCP.
     Returns real-time data with ratings, reviews, photos, and more.
     Agent will estimate costs based on price tier and add to response.
     """
-    location = params.get("location")
-    food_type = params.get("food_type", "")
-    num_guests = params.get("num_guests", 1)
-    max_price_per_person = params.get("max_price_per_person")
-    min_rating = params.get("min_rating")
-    
-    if not location:
-        raise HTTPException(status_code=400, detail="location is required")
-    
-    # Get coordinates for the location
-    lat, lng = await get_location_coordinates(location)
+    location = params.location
+    food_type = params.food_type
+    num_guests = params.num_guests
+    max_price_per_person = params.max_price_per_person
+    min_rating = params.min_rating
     
-    print(f"🍽️ [RESTAURANTS] Searching for {food_type or 'restaurants'} in {location} ({lat}, {lng})")
-    print(f"   Filters: num_guests={num_guests}, max_price_per_person={max_price_per_person}, min_rating={min_rating}")
+    log.debug("🍽️ [RESTAURANTS] Searching for %s in %s\n   Filters: num_guests=%s, max_price_per_person=%s, min_rating=%s",
+              food_type or "restaurants", location, num_guests, max_price_per_person, min_rating)
     
     restaurants = []
     yelp_response_text = ""
     yelp_chat_id = None
     
-    # Use Yelp Fusion AI via MCP (with v3 fallback for rate limits)
-    if YELP_API_KEY:
-        query = f"Find the best {food_type + ' ' if food_type else ''}restaurants in {location}"
-        result = await call_yelp_fusion_ai(
-            query=query, 
-            lat=lat, 
-            lng=lng,
-            fallback_term=f"{food_type} restaurants" if food_type else "restaurants",
-            fallback_location=location,
-            fallback_categories="restaurants,food"
-        )
+    # Geocode and search Yelp Fusion AI via MCP (with v3 fallback for rate limits)
+    (lat, lng), result = await _locate_and_search(
+        location,
+        query=f"Find the best {food_type + ' ' if food_type else ''}restaurants in {location}",
+        fallback_term=f"{food_type} restaurants" if food_type else "restaurants",
+        fallback_categories="restaurants,food"
+    )
+    
+    if result and result.get("businesses"):
+        yelp_response_text = result.get("response_text", "")
+        yelp_chat_id = result.get("chat_id")
         
-        if result and result.get("businesses"):
-            yelp_response_text = result.get("response_text", "")
-            yelp_chat_id = result.get("chat_id")
-            
-            for biz in result["businesses"][:5]:  # Top 5 results
-                # Get coordinates if available (handle both list and dict formats)
-                coords = biz.get("coordinates")
-                if isinstance(coords, list) and len(coords) >= 2:
-                    biz_lat = coords[0] if coords[0] is not None else lat
-                    biz_lng = coords[1] if coords[1] is not None else lng
-                elif isinstance(coords, dict):
-                    biz_lat = coords.get("latitude", lat)
-                    biz_lng = coords.get("longitude", lng)
-                else:
-                    biz_lat, biz_lng = lat, lng
-                
-                # Get location info
-                location_info = biz.get("location", {})
-                address = location_info.get("formatted_address", "")
-                if not address:
-                    address = ", ".join(location_info.get("display_address", [f"Near {location}"]))
-                
-                # Get contextual info (hours, reviews, photos)
-                contextual = biz.get("contextual_info", {})
-                review_snippet = contextual.get("review_snippet", "")
-                if review_snippet:
-                    review_snippet = review_snippet.replace("[[HIGHLIGHT]]", "").replace("[[ENDHIGHLIGHT]]", "")
-                
-                # Get photos
-                photos = contextual.get("photos", [])
-                photo_urls = [p.get("original_url") for p in photos if p.get("original_url")]
-                
-                # Get attributes (amenities)
-                attributes = biz.get("attributes", {})
-                
-                rating = biz.get("rating", 0)
-                
-                # Apply filters
-                if min_rating and rating < min_rating:
-                    continue  # Skip restaurants below min rating
-                
-                restaurant = {
-                    "name": biz.get("name", "Unknown Restaurant"),
-                    "rating": rating,
-                    "review_count": biz.get("review_count", 0),
-                    "price": biz.get("price", "$$"),
-                    "address": address,
-                    "phone": biz.get("phone", biz.get("display_phone", "")),
-                    "coordinates": [biz_lat, biz_lng],
-                    "yelp_url": biz.get("url", f"https://yelp.com/search?find_desc=restaurant&find_loc={location}"),
-                    "image_url": biz.get("image_url", photo_urls[0] if photo_urls else "https://via.placeholder.com/300x200"),
-                    "photos": photo_urls[:3],  # Up to 3 photos
-                    "categories": [cat.get("title", "") if isinstance(cat, dict) else str(cat) for cat in biz.get("categories", [])],
-                    "is_closed": biz.get("is_closed", False),
-                    "review_highlight": review_snippet,
-                    "website": attributes.get("BusinessUrl", ""),
-                    "delivery": attributes.get("RestaurantsDelivery", False),
-                    "takeout": attributes.get("RestaurantsTakeOut", False),
-                    "reservations": attributes.get("RestaurantsReservations", False),
-                    "outdoor_seating": attributes.get("OutdoorSeating", False),
-                    # Cost estimation placeholders (agent will populate these)
-                    "num_guests": num_guests,
-                    "estimated_cost_per_person": None,  # Agent fills via LLM reasoning
-                    "estimated_total": None,  # Agent calculates: cost_per_person * num_guests
-                }
-                restaurants.append(restaurant)
+        # Per-request fallbacks, built once rather than per business
+        fallback_url = RESTAURANT_SEARCH_URL.format(location)
+        near_location = [f"Near {location}"]
+        
+        for biz in result["businesses"][:5]:  # Top 5 results
+            # Apply filters before building the dict, so skipped restaurants cost nothing
+            if min_rating and biz.get("rating", 0) < min_rating:
+                continue  # Skip restaurants below min rating
             
-            print(f"✅ [RESTAURANTS] Found {len(restaurants)} restaurants via Yelp Fusion AI MCP")
+            restaurant = _business_fields(biz, "Unknown Restaurant", lat, lng, fallback_url, near_location, RESTAURANT_ATTR_FIELDS)
+            restaurant.update({
+                "price": biz.get("price", "$$"),
+                # Cost estimation placeholders (agent will populate these)
+                "num_guests": num_guests,
+                "estimated_cost_per_person": None,  # Agent fills via LLM reasoning
+                "estimated_total": None,  # Agent calculates: cost_per_person * num_guests
+            })
+            restaurants.append(restaurant)
+        
+        log.debug("✅ [RESTAURANTS] Found %d restaurants via Yelp Fusion AI MCP", len(restaurants))
     
     # Return error if no results
     if not restaurants:
-        print(f"⚠️ [RESTAURANTS] No results found - Yelp API key may be missing")
+        log.warning("⚠️ [RESTAURANTS] No results found - Yelp API key may be missing")
         return {
             "location": location,
             "food_type": food_type,
@@ -590,118 +1335,66 @@ async def search_restaurants(params: dict) -> dict:
     }
 
 
-@app.post("/tools/get_activities")
-async def get_activities(params: dict) -> dict:
+@_tool_route("/tools/get_activities")
+@_cached_tool()
+async def get_activities(params: ActivitySearchParams) -> dict:
     """
     Get top-rated activities and attractions using Yelp Fusion AI MCP.
     Returns real-time data with ratings, reviews, photos, and more.
     Agent will estimate costs based on activity type and add to response.
     """
-    location = params.get("location")
-    activity_type = params.get("activity_type", "")  # Optional filter
-    num_guests = params.get("num_guests", 1)
-    max_price_per_person = params.get("max_price_per_person")
-    min_rating = params.get("min_rating")
-    
-    if not location:
-        raise HTTPException(status_code=400, detail="location is required")
-    
-    # Get coordinates for the location
-    lat, lng = await get_location_coordinates(location)
+    location = params.location
+    activity_type = params.activity_type  # Optional filter
+    num_guests = params.num_guests
+    max_price_per_person = params.max_price_per_person
+    min_rating = params.min_rating
     
-    print(f"🎯 [ACTIVITIES] Searching for activities in {location} ({lat}, {lng})")
-    print(f"   Filters: num_guests={num_guests}, max_price_per_person={max_price_per_person}, min_rating={min_rating}")
+    log.debug("🎯 [ACTIVITIES] Searching for activities in %s\n   Filters: num_guests=%s, max_price_per_person=%s, min_rating=%s",
+              location, num_guests, max_price_per_person, min_rating)
     
     activities = []
     yelp_response_text = ""
     yelp_chat_id = None
     
-    # Use Yelp Fusion AI via MCP (with v3 fallback for rate limits)
-    if YELP_API_KEY:
-        query = f"What are the top {activity_type + ' ' if activity_type else ''}things to do and attractions in {location}?"
-        result = await call_yelp_fusion_ai(
-            query=query, 
-            lat=lat, 
-            lng=lng,
-            fallback_term=f"{activity_type} activities" if activity_type else "things to do",
-            fallback_location=location,
-            fallback_categories="active,arts,tours"
-        )
+    # Geocode and search Yelp Fusion AI via MCP (with v3 fallback for rate limits)
+    (lat, lng), result = await _locate_and_search(
+        location,
+        query=f"What are the top {activity_type + ' ' if activity_type else ''}things to do and attractions in {location}?",
+        fallback_term=f"{activity_type} activities" if activity_type else "things to do",
+        fallback_categories="active,arts,tours"
+    )
+    
+    if result and result.get("businesses"):
+        yelp_response_text = result.get("response_text", "")
+        yelp_chat_id = result.get("chat_id")
         
-        if result and result.get("businesses"):
-            yelp_response_text = result.get("response_text", "")
-            yelp_chat_id = result.get("chat_id")
+        # Per-request fallbacks, built once rather than per business
+        fallback_url = ACTIVITY_SEARCH_URL.format(location)
+        near_location = [f"Near {location}"]
+        
+        for biz in result["businesses"][:5]:  # Top 5 results
+            # Apply filters before building the dict, so skipped activities cost nothing
+            if min_rating and biz.get("rating", 0) < min_rating:
+                continue  # Skip activities below min rating
             
-            for biz in result["businesses"][:5]:  # Top 5 results
-                # Get coordinates if available (handle both list and dict formats)
-                coords = biz.get("coordinates")
-                if isinstance(coords, list) and len(coords) >= 2:
-                    biz_lat = coords[0] if coords[0] is not None else lat
-                    biz_lng = coords[1] if coords[1] is not None else lng
-                elif isinstance(coords, dict):
-                    biz_lat = coords.get("latitude", lat)
-                    biz_lng = coords.get("longitude", lng)
-                else:
-                    biz_lat, biz_lng = lat, lng
-                
-                # Get location info
-                location_info = biz.get("location", {})
-                address = location_info.get("formatted_address", "")
-                if not address:
-                    address = ", ".join(location_info.get("display_address", [f"Near {location}"]))
-                
-                # Get primary category
-                categories = biz.get("categories", [])
-                primary_type = categories[0].get("title", "Attraction") if categories else "Attraction"
-                
-                # Get contextual info
-                contextual = biz.get("contextual_info", {})
-                review_snippet = contextual.get("review_snippet", "")
-                if review_snippet:
-                    review_snippet = review_snippet.replace("[[HIGHLIGHT]]", "").replace("[[ENDHIGHLIGHT]]", "")
-                
-                # Get photos
-                photos = contextual.get("photos", [])
-                photo_urls = [p.get("original_url") for p in photos if p.get("original_url")]
-                
-                # Get attributes
-                attributes = biz.get("attributes", {})
-                
-                rating = biz.get("rating", 0)
-                
-                # Apply filters
-                if min_rating and rating < min_rating:
-                    continue  # Skip activities below min rating
-                
-                activity = {
-                    "name": biz.get("name", "Unknown Activity"),
-                    "rating": rating,
-                    "review_count": biz.get("review_count", 0),
-                    "type": primary_type,
-                    "address": address,
-                    "phone": biz.get("phone", biz.get("display_phone", "")),
-                    "coordinates": [biz_lat, biz_lng],
-                    "yelp_url": biz.get("url", f"https://yelp.com/search?find_desc=things+to+do&find_loc={location}"),
-                    "image_url": biz.get("image_url", photo_urls[0] if photo_urls else "https://via.placeholder.com/300x200"),
-                    "photos": photo_urls[:3],
-                    "categories": [cat.get("title", "") if isinstance(cat, dict) else str(cat) for cat in categories],
-                    "is_closed": biz.get("is_closed", False),
-                    "review_highlight": review_snippet,
-                    "website": attributes.get("BusinessUrl", ""),
-                    "wheelchair_accessible": attributes.get("WheelchairAccessible", False),
-                    "good_for_kids": attributes.get("GoodForKids", False),
-                    # Cost estimation placeholders (agent will populate these)
-                    "num_guests": num_guests,
-                    "estimated_cost_per_person": None,  # Agent fills via LLM reasoning
-                    "estimated_total": None,  # Agent calculates: cost_per_person * num_guests
-                }
-                activities.append(activity)
+            activity = _business_fields(biz, "Unknown Activity", lat, lng, fallback_url, near_location, ACTIVITY_ATTR_FIELDS)
             
-            print(f"✅ [ACTIVITIES] Found {len(activities)} activities via Yelp Fusion AI MCP")
+            # Get primary category
+            categories = biz.get("categories", [])
+            activity.update({
+                "type": categories[0].get("title", "Attraction") if categories else "Attraction",
+                # Cost estimation placeholders (agent will populate these)
+                "num_guests": num_guests,
+                "estimated_cost_per_person": None,  # Agent fills via LLM reasoning
+                "estimated_total": None,  # Agent calculates: cost_per_person * num_guests
+            })
+            activities.append(activity)
+        
+        log.debug("✅ [ACTIVITIES] Found %d activities via Yelp Fusion AI MCP", len(activities))
     
     # Return error if no results
     if not activities:
-        print(f"⚠️ [ACTIVITIES] No results found - Yelp API key may be missing")
+        log.warning("⚠️ [ACTIVITIES] No results found - Yelp API key may be missing")
         return {
             "location": location,
             "activities": [],
@@ -723,127 +1416,74 @@ async def get_activities(params: dict) -> dict:
     }
 
 
-@app.post("/tools/search_hotels")
-async def search_hotels(params: dict) -> dict:
+@_tool_route("/tools/search_hotels")
+@_cached_tool()
+async def search_hotels(params: HotelSearchParams) -> dict:
     """
     Search for hotels and accommodations using Yelp Fusion AI MCP.
     Returns real-time data with ratings, reviews, photos, and more.
     Agent will estimate costs per night based on price tier and add to response.
     """
-    location = params.get("location")
-    num_guests = params.get("num_guests", 1)
-    num_rooms = params.get("num_rooms", 1)
-    nights = params.get("nights", 1)
-    max_price_per_night = params.get("max_price_per_night")
-    min_rating = params.get("min_rating")
-    
-    if not location:
-        raise HTTPException(status_code=400, detail="location is required")
+    location = params.location
+    num_guests = params.num_guests
+    num_rooms = params.num_rooms
+    nights = params.nights
+    max_price_per_night = params.max_price_per_night
+    min_rating = params.min_rating
     
-    # Get coordinates for the location
-    lat, lng = await get_location_coordinates(location)
-    
-    print(f"🏨 [HOTELS] Searching for hotels in {location} ({lat}, {lng})")
-    print(f"   Filters: num_guests={num_guests}, num_rooms={num_rooms}, nights={nights}, max_price_per_night={max_price_per_night}, min_rating={min_rating}")
+    log.debug("🏨 [HOTELS] Searching for hotels in %s\n   Filters: num_guests=%s, num_rooms=%s, nights=%s, max_price_per_night=%s, min_rating=%s",
+              location, num_guests, num_rooms, nights, max_price_per_night, min_rating)
     
     hotels = []
     yelp_response_text = ""
     yelp_chat_id = None
     
-    # Use Yelp Fusion AI via MCP (with v3 fallback for rate limits)
-    if YELP_API_KEY:
-        query = f"Find the best hotels and places to stay in {location}"
-        result = await call_yelp_fusion_ai(
-            query=query, 
-            lat=lat, 
-            lng=lng,
-            fallback_term="hotels",
-            fallback_location=location,
-            fallback_categories="hotels,hostels,bedbreakfast"
-        )
+    # Geocode and search Yelp Fusion AI via MCP (with v3 fallback for rate limits)
+    (lat, lng), result = await _locate_and_search(
+        location,
+        query=f"Find the best hotels and places to stay in {location}",
+        fallback_term="hotels",
+        fallback_categories="hotels,hostels,bedbreakfast"
+    )
+    
+    if result and result.get("businesses"):
+        yelp_response_text = result.get("response_text", "")
+        yelp_chat_id = result.get("chat_id")
         
-        if result and result.get("businesses"):
-            yelp_response_text = result.get("response_text", "")
-            yelp_chat_id = result.get("chat_id")
+        # Per-request fallbacks, built once rather than per business
+        fallback_url = HOTEL_SEARCH_URL.format(location)
+        near_location = [f"Near {location}"]
+        
+        for biz in result["businesses"][:5]:  # Top 5 results
+            # Apply filters before building the dict, so skipped hotels cost nothing
+            if min_rating and biz.get("rating", 0) < min_rating:
+                continue  # Skip hotels below min rating
             
-            for biz in result["businesses"][:5]:  # Top 5 results
-                # Get coordinates if available (handle both list and dict formats)
-                coords = biz.get("coordinates")
-                if isinstance(coords, list) and len(coords) >= 2:
-                    biz_lat = coords[0] if coords[0] is not None else lat
-                    biz_lng = coords[1] if coords[1] is not None else lng
-                elif isinstance(coords, dict):
-                    biz_lat = coords.get("latitude", lat)
-                    biz_lng = coords.get("longitude", lng)
-                else:
-                    biz_lat, biz_lng = lat, lng
-                
-                # Get location info
-                location_info = biz.get("location", {})
-                address = location_info.get("formatted_address", "")
-                if not address:
-                    address = ", ".join(location_info.get("display_address", [f"Near {location}"]))
-                
-                # Get contextual info
-                contextual = biz.get("contextual_info", {})
-                review_snippet = contextual.get("review_snippet", "")
-                if review_snippet:
-                    review_snippet = review_snippet.replace("[[HIGHLIGHT]]", "").replace("[[ENDHIGHLIGHT]]", "")
-                
-                # Get photos
-                photos = contextual.get("photos", [])
-                photo_urls = [p.get("original_url") for p in photos if p.get("original_url")]
-                
-                # Get attributes
-                attributes = biz.get("attributes", {})
-                
-                # Extract amenities from attributes
-                amenities = []
-                if attributes.get("WiFi") and attributes.get("WiFi") != "no":
-                    amenities.append("WiFi")
-                if attributes.get("BusinessParking"):
-                    amenities.append("Parking")
-                if attributes.get("WheelchairAccessible"):
-                    amenities.append("Accessible")
-                if attributes.get("DogsAllowed"):
-                    amenities.append("Pet Friendly")
-                
-                rating = biz.get("rating", 0)
-                
-                # Apply filters
-                if min_rating and rating < min_rating:
-                    continue  # Skip hotels below min rating
-                
-                hotel = {
-                    "name": biz.get("name", "Unknown Hotel"),
-                    "rating": rating,
-                    "review_count": biz.get("review_count", 0),
-                    "price": biz.get("price", "$$"),
-                    "address": address,
-                    "phone": biz.get("phone", biz.get("display_phone", "")),
-                    "coordinates": [biz_lat, biz_lng],
-                    "yelp_url": biz.get("url", f"https://yelp.com/search?find_desc=hotels&find_loc={location}"),
-                    "image_url": biz.get("image_url", photo_urls[0] if photo_urls else "https://via.placeholder.com/300x200"),
-                    "photos": photo_urls[:3],
-                    "categories": [cat.get("title", "") if isinstance(cat, dict) else str(cat) for cat in biz.get("categories", [])],
-                    "is_closed": biz.get("is_closed", False),
-                    "review_highlight": review_snippet,
-                    "amenities": amenities,
-                    "website": attributes.get("BusinessUrl", ""),
-                    # Cost estimation placeholders (agent will populate these)
-                    "num_guests": num_guests,
-                    "num_rooms": num_rooms,
-                    "nights": nights,
-                    "estimated_cost_per_night": None,  # Agent fills via LLM reasoning (per room)
-                    "estimated_total": None,  # Agent calculates: cost_per_night * nights * num_rooms
-                }
-                hotels.append(hotel)
+            hotel = _business_fields(biz, "Unknown Hotel", lat, lng, fallback_url, near_location)
             
-            print(f"✅ [HOTELS] Found {len(hotels)} hotels via Yelp Fusion AI MCP")
+            # Extract amenities from attributes
+            attributes = biz.get("attributes", {})
+            wifi = attributes.get("WiFi")
+            amenities = ["WiFi"] if wifi and wifi != "no" else []
+            amenities.extend(label for attr, label in HOTEL_AMENITY_ATTRS if attributes.get(attr))
+            
+            hotel.update({
+                "price": biz.get("price", "$$"),
+                "amenities": amenities,
+                # Cost estimation placeholders (agent will populate these)
+                "num_guests": num_guests,
+                "num_rooms": num_rooms,
+                "nights": nights,
+                "estimated_cost_per_night": None,  # Agent fills via LLM reasoning (per room)
+                "estimated_total": None,  # Agent calculates: cost_per_night * nights * num_rooms
+            })
+            hotels.append(hotel)
+        
+        log.debug("✅ [HOTELS] Found %d hotels via Yelp Fusion AI MCP", len(hotels))
     
     # Return error if no results
     if not hotels:
-        print(f"⚠️ [HOTELS] No results found - Yelp API key may be missing")
+        log.warning("⚠️ [HOTELS] No results found - Yelp API key may be missing")
         return {
             "location": location,
             "hotels": [],
@@ -870,28 +1510,40 @@ async def search_hotels(params: dict) -> dict:
     }
 
 
-@app.post("/tools/update_map")
-async def update_map(params: dict) -> dict:
+def _update_map_cache_key(params: "UpdateMapParams") -> bytes:
+    """Waypoints may contain dicts, so key on the canonical JSON of the request instead"""
+    return orjson.dumps(params.model_dump(), option=orjson.OPT_SORT_KEYS)
+
+
+@_tool_route("/tools/update_map")
+# Only real Mapbox routes are cached; straight-line fallbacks retry Directions next time
+@_cached_tool(key=_update_map_cache_key, should_cache=lambda result: "distance" in result)
+async def update_map(params: UpdateMapParams) -> dict:
     """
     Update the map with a route or path based on conversation context.
     This tool processes travel plans and generates route coordinates.
     """
-    route_description = params.get("route_description", "")
-    waypoints = params.get("waypoints", [])  # List of locations to visit
-    route_type = params.get("route_type", "driving")  # driving, walking, transit
+    route_description = params.route_description
+    waypoints = params.waypoints  # List of locations to visit
+    route_type = params.route_type  # driving, walking, transit
     
     if not waypoints and not route_description:
         raise HTTPException(status_code=400, detail="Either waypoints or route_description is required")
     
     # If waypoints provided, use them directly
     if waypoints:
-        route_coordinates = []
-        for waypoint in waypoints:
-            if isinstance(waypoint, str):
-                lat, lng = await get_location_coordinates(waypoint)
-                route_coordinates.append({"location": waypoint, "coordinates": [lat, lng]})
-            elif isinstance(waypoint, dict) and "coordinates" in waypoint:
-                route_coordinates.append(waypoint)
+        # Partition by type once: names get geocoded in one batch, resolved dicts pass through.
+        # Results are slotted back by index so the original order is kept.
+        str_wps = [(i, wp) for i, wp in enumerate(waypoints) if isinstance(wp, str)]
+        dict_wps = [(i, wp) for i, wp in enumerate(waypoints) if isinstance(wp, dict) and "coordinates" in wp]
+        slots = [None] * len(waypoints)
+        # batch_geocode dedupes repeated places ("SF -> LA -> back to SF") by normalized name
+        geocoded = await batch_geocode([wp for _, wp in str_wps])
+        for (i, wp), (lat, lng) in zip(str_wps, geocoded):
+            slots[i] = {"location": wp, "coordinates": [lat, lng]}
+        for i, wp in dict_wps:
+            slots[i] = wp
+        route_coordinates = [wp for wp in slots if wp is not None]
         
         # Generate waypoint coordinates
         waypoint_coords = [wp["coordinates"] for wp in route_coordinates]
@@ -902,7 +1554,8 @@ async def update_map(params: dict) -> dict:
         if route_data and route_data.get("path"):
             # Use real route from Mapbox Directions API
             path_coordinates = route_data["path"]
-            bounds = _calculate_bounds(path_coordinates, padding=0.15)
+            # get_route_from_mapbox only returns paths with 2+ validated points, already as an array
+            bounds = _calculate_bounds_fast(route_data["path_array"], padding=0.15)
             
             return {
                 "route_type": route_type,
@@ -915,22 +1568,18 @@ async def update_map(params: dict) -> dict:
             }
         else:
             # Fallback to simple path if Mapbox API fails or token not available
-            bounds = _calculate_bounds(waypoint_coords, padding=0.15)
-            
-            # Generate simple straight-line path as fallback
+            # Generate simple straight-line path as fallback: each waypoint followed by
+            # 5 evenly spaced intermediate points toward the next one, for smoother drawing
             path_coordinates = []
-            for i in range(len(waypoint_coords)):
-                path_coordinates.append(waypoint_coords[i])
-                # Add intermediate points between waypoints for smoother route visualization
-                if i < len(waypoint_coords) - 1:
-                    start = waypoint_coords[i]
-                    end = waypoint_coords[i + 1]
-                    # Generate 5 intermediate points between start and end
-                    for j in range(1, 6):
-                        ratio = j / 6.0
-                        intermediate_lat = start[0] + (end[0] - start[0]) * ratio
-                        intermediate_lng = start[1] + (end[1] - start[1]) * ratio
-                        path_coordinates.append([intermediate_lat, intermediate_lng])
+            bounds = None
+            if waypoint_coords:
+                arr = np.asarray(waypoint_coords, dtype=np.float64)[:, :2]
+                # Interpolated points stay inside the waypoints' box, so bound the waypoints
+                bounds = _calculate_bounds_fast(arr, padding=0.15)
+                # Every segment interpolated in one broadcast: (n-1, steps, 2) -> rows
+                starts = arr[:-1, None, :]
+                segments = starts + (arr[1:, None, :] - starts) * _FALLBACK_T
+                path_coordinates = np.concatenate((segments.reshape(-1, 2), arr[-1:])).tolist()
             
             return {
                 "route_type": route_type,
@@ -951,6 +1600,33 @@ async def update_map(params: dict) -> dict:
     }
 
 
+def _padded_bounds(max_lat: float, min_lat: float, max_lng: float, min_lng: float, padding: float) -> dict:
+    """Bounds dict for the given extremes, padded by a fraction of each range"""
+    # Add padding (ensure minimum padding for very close points)
+    lat_padding = max((max_lat - min_lat) * padding, 0.01)  # At least 0.01 degrees
+    lng_padding = max((max_lng - min_lng) * padding, 0.01)
+    
+    return {
+        "north": max_lat + lat_padding,
+        "south": min_lat - lat_padding,
+        "east": max_lng + lng_padding,
+        "west": min_lng - lng_padding
+    }
+
+
+def _calculate_bounds_fast(arr: np.ndarray, padding: float = 0.1) -> dict:
+    """_calculate_bounds for a non-empty (N, 2+) float64 [lat, lng] array, without the
+    empty-input guard or the list walk, using numpy's C reductions
+    """
+    # Reduce each column separately: a min/max over axis=0 of a narrow (N, 2) array
+    # walks it with a strided inner loop and is ~15x slower on long routes
+    lat = arr[:, 0]
+    lng = arr[:, 1]
+    min_lat, max_lat = float(lat.min()), float(lat.max())
+    min_lng, max_lng = float(lng.min()), float(lng.max())
+    return _padded_bounds(max_lat, min_lat, max_lng, min_lng, padding)
+
+
 def _calculate_bounds(coordinates: list, padding: float = 0.1) -> dict:
     """Calculate bounding box for map view with padding
     
@@ -964,110 +1640,158 @@ def _calculate_bounds(coordinates: list, padding: float = 0.1) -> dict:
     if not coordinates:
         return None
     
-    lats = [coord[0] for coord in coordinates]
-    lngs = [coord[1] for coord in coordinates]
-    
-    # Calculate base bounds
-    min_lat = min(lats)
-    max_lat = max(lats)
-    min_lng = min(lngs)
-    max_lng = max(lngs)
-    
-    # Calculate lat/lng ranges for padding
-    lat_range = max_lat - min_lat
-    lng_range = max_lng - min_lng
-    
-    # Add padding (ensure minimum padding for very close points)
-    lat_padding = max(lat_range * padding, 0.01)  # At least 0.01 degrees
-    lng_padding = max(lng_range * padding, 0.01)
+    # Single pass tracking all four extremes, no temporary lists. Lists stay in Python at
+    # any length: converting one to an array costs ~3x this loop, so callers that already
+    # hold an array use _calculate_bounds_fast instead.
+    it = iter(coordinates)
+    first = next(it)
+    max_lat = min_lat = first[0]
+    max_lng = min_lng = first[1]
+    for point in it:
+        lat = point[0]
+        lng = point[1]
+        if lat > max_lat:
+            max_lat = lat
+        elif lat < min_lat:
+            min_lat = lat
+        if lng > max_lng:
+            max_lng = lng
+        elif lng < min_lng:
+            min_lng = lng
     
-    return {
-        "north": max_lat + lat_padding,
-        "south": min_lat - lat_padding,
-        "east": max_lng + lng_padding,
-        "west": min_lng - lng_padding
-    }
+    return _padded_bounds(max_lat, min_lat, max_lng, min_lng, padding)
+
+
+async def _run_batch_call(call: BatchToolCall) -> dict:
+    """Validate and run one /tools/batch item; failures become that item's error result"""
+    if call.tool not in TOOLS:
+        return {"error": f"Unknown tool: {call.tool}"}
+    func, params_model = TOOLS[call.tool]
+    try:
+        params = params_model.model_validate(call.params)
+    except ValidationError as e:
+        return {"error": "Invalid params", "detail": jsonable_encoder(e.errors())}
+    try:
+        return await func(params)
+    except HTTPException as e:
+        return {"error": e.detail}
+    except Exception as e:
+        log.error("❌ [BATCH] %s failed: %s", call.tool, e)
+        return {"error": str(e)}
+
+
+@app.post("/tools/batch", response_model=None)
+async def batch_tools(calls: Annotated[list[BatchToolCall], Body(min_length=1, max_length=TOOL_BATCH_MAX_CALLS)]):
+    """
+    Run several tool calls from one request concurrently, e.g. restaurants, activities
+    and hotels for the same trip. Results come back in request order.
+    """
+    # Resolve each distinct location once up front, so siblings searching the same place
+    # hit the geocode cache. This goes through the same lookup as a single tool call (not
+    # the v6 batch, which has no POIs), so cached coordinates match what the tool would get
+    locations = {loc for call in calls if isinstance(loc := call.params.get("location"), str) and loc}
+    if len(calls) > 1 and locations:
+        await asyncio.gather(*[get_location_coordinates(location) for location in locations])
+    results = await asyncio.gather(*[_run_batch_call(call) for call in calls])
+    return OrjsonResponse({"results": results})
+
+
+# Static endpoint bodies, encoded once at import and served as raw bytes
+_ROOT_BYTES = orjson.dumps({
+    "status": "healthy",
+    "service": "NomadSync MCP Server",
+    "version": "1.0.0"
+})
+_HEALTH_BYTES = orjson.dumps({"status": "ok"})
 
 
 @app.get("/")
 async def root():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "service": "NomadSync MCP Server",
-        "version": "1.0.0"
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 @app.get("/health")
 async def health():
     """Health check endpoint"""
-    return {"status": "ok"}
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
+
+# Integration availability is fixed at import (env + yelp-mcp import), so encode it once too
+_STATUS_BYTES = orjson.dumps({
+    "status": "healthy",
+    "integrations": {
+        "yelp": {
+            "available": bool(YELP_API_KEY and YELP_MCP_AVAILABLE),
+            "api_key_configured": bool(YELP_API_KEY),
+            "mcp_module_loaded": YELP_MCP_AVAILABLE,
+            "description": "Yelp Fusion AI for restaurants, activities, hotels"
+        },
+        "mapbox": {
+            "available": bool(MAPBOX_ACCESS_TOKEN),
+            "api_key_configured": bool(MAPBOX_ACCESS_TOKEN),
+            "description": "Mapbox for geocoding and routing"
+        }
+    },
+    "services": {
+        "search_restaurants": bool(YELP_API_KEY and YELP_MCP_AVAILABLE),
+        "get_activities": bool(YELP_API_KEY and YELP_MCP_AVAILABLE),
+        "search_hotels": bool(YELP_API_KEY and YELP_MCP_AVAILABLE),
+        "update_map": bool(MAPBOX_ACCESS_TOKEN)
+    }
+})
+
 
 @app.get("/status")
 async def status():
     """Get detailed status of all integrations"""
-    return {
-        "status": "healthy",
-        "integrations": {
-            "yelp": {
-                "available": bool(YELP_API_KEY and YELP_MCP_AVAILABLE),
-                "api_key_configured": bool(YELP_API_KEY),
-                "mcp_module_loaded": YELP_MCP_AVAILABLE,
-                "description": "Yelp Fusion AI for restaurants, activities, hotels"
-            },
-            "mapbox": {
-                "available": bool(MAPBOX_ACCESS_TOKEN),
-                "api_key_configured": bool(MAPBOX_ACCESS_TOKEN),
-                "description": "Mapbox for geocoding and routing"
+    return Response(content=_STATUS_BYTES, media_type="application/json")
+
+
+_TOOLS_BYTES = orjson.dumps({
+    "tools": [
+        {
+            "name": "search_restaurants",
+            "description": "Search for restaurants in a location using Yelp",
+            "parameters": {
+                "location": {"type": "string", "required": True},
+                "food_type": {"type": "string", "required": False}
+            }
+        },
+        {
+            "name": "get_activities",
+            "description": "Get top-rated activities and attractions from Tripadvisor",
+            "parameters": {
+                "location": {"type": "string", "required": True}
+            }
+        },
+        {
+            "name": "search_hotels",
+            "description": "Search for hotels and accommodations",
+            "parameters": {
+                "location": {"type": "string", "required": True},
+                "budget_sol": {"type": "number", "required": False}
             }
         },
-        "services": {
-            "search_restaurants": bool(YELP_API_KEY and YELP_MCP_AVAILABLE),
-            "get_activities": bool(YELP_API_KEY and YELP_MCP_AVAILABLE),
-            "search_hotels": bool(YELP_API_KEY and YELP_MCP_AVAILABLE),
-            "update_map": bool(MAPBOX_ACCESS_TOKEN)
+        {
+            "name": "update_map",
+            "description": "Update the map with a route or path based on travel plans. Use this when users describe a trip itinerary or route.",
+            "parameters": {
+                "waypoints": {"type": "array", "description": "List of locations to visit in order", "required": False},
+                "route_description": {"type": "string", "description": "Description of the route or trip plan", "required": False},
+                "route_type": {"type": "string", "description": "Type of route: driving, walking, or transit", "required": False}
+            }
         }
-    }
+    ]
+})
+# The tool list is static, so its ETag is computed once; tool calls are POSTs and aren't tagged
+_TOOLS_ETAG = f'"{hashlib.blake2b(_TOOLS_BYTES, digest_size=16).hexdigest()}"'
+
 
 @app.get("/tools")
-async def list_tools():
-    """List all available tools"""
-    return {
-        "tools": [
-            {
-                "name": "search_restaurants",
-                "description": "Search for restaurants in a location using Yelp",
-                "parameters": {
-                    "location": {"type": "string", "required": True},
-                    "food_type": {"type": "string", "required": False}
-                }
-            },
-            {
-                "name": "get_activities",
-                "description": "Get top-rated activities and attractions from Tripadvisor",
-                "parameters": {
-                    "location": {"type": "string", "required": True}
-                }
-            },
-            {
-                "name": "search_hotels",
-                "description": "Search for hotels and accommodations",
-                "parameters": {
-                    "location": {"type": "string", "required": True},
-                    "budget_sol": {"type": "number", "required": False}
-                }
-            },
-            {
-                "name": "update_map",
-                "description": "Update the map with a route or path based on travel plans. Use this when users describe a trip itinerary or route.",
-                "parameters": {
-                    "waypoints": {"type": "array", "description": "List of locations to visit in order", "required": False},
-                    "route_description": {"type": "string", "description": "Description of the route or trip plan", "required": False},
-                    "route_type": {"type": "string", "description": "Type of route: driving, walking, or transit", "required": False}
-                }
-            }
-        ]
-    }
+async def list_tools(request: Request):
+    """List all available tools (an If-None-Match matching the ETag gets an empty 304)"""
+    if request.headers.get("if-none-match") == _TOOLS_ETAG:
+        return Response(status_code=304, headers={"ETag": _TOOLS_ETAG})
+    return Response(content=_TOOLS_BYTES, media_type="application/json", headers={"ETag": _TOOLS_ETAG})
 
 
 @app.get("/api/solana/vendor")
@@ -1083,5 +1807,23 @@ if __name__ == "__main__":
     # Run the MCP server
     import uvicorn
     port = int(os.getenv("MCP_SERVER_PORT", "8000"))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Each worker process keeps its own geocode/tool caches, so default to one. Only the
+    # explicit MCP_SERVER_WORKERS counts: PaaS platforms set WEB_CONCURRENCY on their own
+    workers = int(os.getenv("MCP_SERVER_WORKERS", "1"))
+    if workers > 1 and not os.getenv("VENDOR_SECRET_KEY"):
+        # Without a fixed key every worker's startup generates its own vendor wallet, and
+        # /api/solana/vendor would hand out a different payee depending on the worker
+        log.warning("⚠️ MCP_SERVER_WORKERS=%d needs VENDOR_SECRET_KEY set - running 1 worker", workers)
+        workers = 1
+    # uvloop (libuv event loop) and httptools (C HTTP parser) when installed
+    uvicorn.run(
+        "mcp_server:app" if workers > 1 else app,  # Multiple workers need an import string
+        host="0.0.0.0",
+        port=port,
+        workers=workers,
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
+        access_log=False,  # Tool handlers already log each call
+        log_level="info",
+    )
 
@@ -16,7 +16,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from dotenv import load_dotenv
 load_dotenv()
 
-from mcp_server import get_location_coordinates, update_map, _calculate_bounds
+from mcp_server import get_location_coordinates, update_map, _calculate_bounds, UpdateMapParams
 
 
 class TestResults:
@@ -111,7 +111,7 @@ async def test_route_generation(results):
     # Test 1: Two-point route
     try:
         params = {"waypoints": ["Oakland", "Berkeley"], "route_type": "driving"}
-        result = await update_map(params)
+        result = await update_map(UpdateMapParams(**params))
 
         checks_passed = True
         if "waypoints" not in result:
@@ -137,7 +137,7 @@ async def test_route_generation(results):
     # Test 2: Multi-point route
     try:
         params = {"waypoints": ["San Francisco", "Oakland", "Berkeley"], "route_type": "driving"}
-        result = await update_map(params)
+        result = await update_map(UpdateMapParams(**params))
 
         if len(result["waypoints"]) == 3 and len(result["path"]) >= 3:
             results.record_pass(f"Multi-point route ({len(result['path'])} path points)")
@@ -149,7 +149,7 @@ async def test_route_generation(results):
     # Test 3: Waypoint coordinates format
     try:
         params = {"waypoints": ["Oakland", "Berkeley"], "route_type": "driving"}
-        result = await update_map(params)
+        result = await update_map(UpdateMapParams(**params))
 
         valid_format = True
         for wp in result["waypoints"]:
@@ -170,7 +170,7 @@ async def test_route_generation(results):
     # Test 4: Path coordinate format
     try:
         params = {"waypoints": ["Oakland", "Berkeley"], "route_type": "driving"}
-        result = await update_map(params)
+        result = await update_map(UpdateMapParams(**params))
 
         valid_coords = True
         for i, coord in enumerate(result["path"]):
@@ -193,7 +193,7 @@ async def test_route_generation(results):
     # Test 5: Bounds calculation
     try:
         params = {"waypoints": ["Oakland", "Berkeley"], "route_type": "driving"}
-        result = await update_map(params)
+        result = await update_map(UpdateMapParams(**params))
 
         bounds = result.get("bounds", {})
         if bounds and bounds["north"] > bounds["south"] and bounds["east"] > bounds["west"]:
@@ -207,7 +207,7 @@ async def test_route_generation(results):
     for route_type in ["driving", "walking"]:
         try:
             params = {"waypoints": ["Oakland", "Berkeley"], "route_type": route_type}
-            result = await update_map(params)
+            result = await update_map(UpdateMapParams(**params))
 
             if result["route_type"] == route_type and len(result["path"]) >= 2:
                 results.record_pass(f"Route type '{route_type}'")
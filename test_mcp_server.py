@@ -57,9 +57,45 @@ async def test_mcp_server():
             print(f"  Coordinates: {result.get('coordinates')}")
             print()
         
+        # Test 5: Batch tool calls
+        print("Testing: Batch tool calls")
+        async with session.post(
+            f"{base_url}/tools/batch",
+            json=[
+                {"tool": "search_restaurants", "params": {"location": "Paris"}},
+                {"tool": "get_activities", "params": {"location": "Paris"}},
+            ]
+        ) as response:
+            result = await response.json()
+            print(f"✓ Got {len(result.get('results', []))} batch results")
+            print()
+        
         print("All tests passed! ✓")
 
 
+
+def test_decode_polyline6():
+    """Decode a known polyline6 string (no server needed)"""
+    from mcp_server import _decode_polyline6
+    
+    print("Testing: Decode polyline6")
+    # The reference polyline example, encoded at 1e-6 precision
+    path = _decode_polyline6("_izlhA~rlgdF_{geC~ywl@_kwzCn`{nI")
+    expected = [[38.5, -120.2], [40.7, -120.95], [43.252, -126.453]]
+    assert path.shape == (3, 2), path.shape
+    for (lat, lng), (exp_lat, exp_lng) in zip(path.tolist(), expected):
+        assert abs(lat - exp_lat) < 1e-9 and abs(lng - exp_lng) < 1e-9, (lat, lng)
+    # A latitude without its longitude is rejected rather than silently dropped
+    try:
+        _decode_polyline6("_izlhA")
+        raise AssertionError("truncated polyline was accepted")
+    except ValueError:
+        pass
+    print(f"✓ Decoded {len(path)} points")
+    print()
+
+
 if __name__ == "__main__":
+    test_decode_polyline6()
     asyncio.run(test_mcp_server())
 